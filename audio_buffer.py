@@ -0,0 +1,180 @@
+import os
+import struct
+import tempfile
+import threading
+from typing import Optional
+
+import numpy as np
+from scipy.io.wavfile import write
+
+
+class RingBuffer:
+    """
+    Fixed-size circular buffer of mono audio samples.
+
+    The audio callback writes into a preallocated array, so continuous capture
+    never allocates. Positions are absolute sample counts since the stream started,
+    which lets readers ask for "the last N samples" or "everything since position P".
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._written = 0  # Total samples written since creation
+        self._lock = threading.Lock()
+
+    @property
+    def total_written(self) -> int:
+        return self._written
+
+    def write(self, samples: np.ndarray):
+        """Appends samples, overwriting the oldest ones once the buffer is full."""
+        total = len(samples)
+        # Only the last `capacity` samples survive, but all of them count as written
+        if total > self.capacity:
+            samples = samples[-self.capacity :]
+        n = len(samples)
+
+        with self._lock:
+            start = (self._written + total - n) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start : start + first] = samples[:first]
+            self._data[: n - first] = samples[first:]
+            self._written += total
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Returns the samples at absolute positions [start, end).
+
+        The result is a view into the buffer when the range does not wrap around,
+        and a copy otherwise. Views are overwritten as capture continues, so copy
+        them if they must outlive the next `capacity` samples.
+
+        Raises:
+            ValueError: If the range is no longer (or not yet) in the buffer.
+        """
+        with self._lock:
+            if start < self._written - self.capacity or end > self._written or start > end:
+                raise ValueError(
+                    f"Range [{start}, {end}) not available (written: {self._written})."
+                )
+            first = start % self.capacity
+            last = first + (end - start)
+            if last <= self.capacity:
+                return self._data[first:last]
+            return np.concatenate((self._data[first:], self._data[: last - self.capacity]))
+
+    def latest(self, n: int) -> np.ndarray:
+        """Returns the most recent `n` samples (fewer if less has been written)."""
+        end = self._written
+        return self.read(max(0, end - min(n, self.capacity)), end)
+
+
+class CaptureBuffer:
+    """
+    Preallocated linear buffer for a single recording.
+
+    The audio callback copies each block straight into the buffer (no per-block
+    allocation, no queue). The buffer doubles in size when it runs out of room,
+    up to `max_samples`; once that bound is reached it is `full` and further
+    samples are dropped.
+
+    Consumers get zero-copy access to the recorded audio through `view()`
+    (NumPy, e.g. for the WAV writer or VAD) and `memoryview()` (raw PCM bytes,
+    e.g. for uploading to STT).
+    """
+
+    def __init__(self, capacity: int, max_samples: Optional[int] = None, dtype=np.int16):
+        if max_samples is not None:
+            capacity = min(capacity, max_samples)
+        self.max_samples = max_samples
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self.max_samples is not None and self._size >= self.max_samples
+
+    def write(self, samples: np.ndarray):
+        """Appends samples. Called from the audio callback."""
+        n = len(samples)
+        end = self._size + n
+
+        if end > len(self._data):
+            new_capacity = max(end, 2 * len(self._data))
+            if self.max_samples is not None:
+                new_capacity = min(new_capacity, self.max_samples)
+                end = min(end, new_capacity)
+                n = end - self._size
+            if new_capacity > len(self._data):
+                grown = np.empty(new_capacity, dtype=self._data.dtype)
+                grown[: self._size] = self._data[: self._size]
+                self._data = grown
+
+        self._data[self._size : end] = samples[:n]
+        # Publish the new size only after the samples are in place, so a reader
+        # in another thread never sees unwritten data
+        self._size = end
+
+    def view(self) -> np.ndarray:
+        """Returns the recorded samples as a NumPy view (no copy)."""
+        size = self._size  # Read the size first: it never covers unwritten samples
+        return self._data[:size]
+
+    def memoryview(self) -> memoryview:
+        """Returns the recorded samples as raw PCM bytes (no copy)."""
+        return memoryview(self.view()).cast("B")
+
+
+def write_temp_wav(samples: np.ndarray, sample_rate: int) -> str:
+    """
+    Writes mono audio to a temporary 16-bit PCM WAV file.
+
+    Args:
+        samples (np.ndarray): float samples in [-1, 1] or int16 samples.
+        sample_rate (int): Sample rate of the audio.
+
+    Returns:
+        str: Path to the temporary audio file.
+    """
+    if samples.dtype != np.int16:
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    write(path, sample_rate, samples)
+    return path
+
+
+def wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Builds an in-memory 16-bit PCM mono WAV file (for uploading to STT without a temp file).
+
+    Args:
+        samples (np.ndarray): int16 samples, e.g. CaptureBuffer.view().
+        sample_rate (int): Sample rate of the audio.
+
+    Returns:
+        bytes: The WAV file contents.
+    """
+    pcm = memoryview(np.ascontiguousarray(samples, dtype=np.int16)).cast("B")
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + pcm.nbytes,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        1,  # mono
+        sample_rate,
+        sample_rate * 2,  # byte rate
+        2,  # block align
+        16,  # bits per sample
+        b"data",
+        pcm.nbytes,
+    )
+    return b"".join((header, pcm))
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: queue + concatenate capture vs. the preallocated CaptureBuffer.
+
+Simulates the sounddevice callback for a recording of `--seconds` of audio and
+measures, for each approach:
+    * callback time (mean / p99 / max)
+    * arrays held when the recording stops (one per block for the queue, one buffer otherwise)
+    * peak traced memory while capturing and producing the int16 data for the WAV writer
+
+Usage:
+    python benchmark_capture_buffer.py --seconds 10 --blocksize 512
+"""
+
+import argparse
+import queue
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from audio_buffer import CaptureBuffer
+
+SAMPLE_RATE = 44100
+
+
+def legacy_capture(blocks):
+    """The previous record_audio path: float32 stream, copy per block, concatenate, convert."""
+    q = queue.Queue()
+    times = []
+
+    def callback(indata):
+        q.put(indata.copy())
+
+    for block in blocks:
+        t0 = time.perf_counter()
+        callback(block)
+        times.append(time.perf_counter() - t0)
+
+    live_blocks = q.qsize()
+    data_chunks = []
+    while not q.empty():
+        data_chunks.append(q.get())
+    recording = np.concatenate(data_chunks, axis=0)
+    data = (recording * 32767).astype(np.int16)
+    return data, times, live_blocks
+
+
+def buffer_capture(blocks, capacity):
+    """The CaptureBuffer path: int16 stream written straight into a preallocated buffer."""
+    buffer = CaptureBuffer(capacity)
+    times = []
+
+    def callback(indata):
+        buffer.write(indata[:, 0])
+
+    for block in blocks:
+        t0 = time.perf_counter()
+        callback(block)
+        times.append(time.perf_counter() - t0)
+
+    return buffer.view(), times, 1
+
+
+def _measure(label, fn, *args):
+    tracemalloc.start()
+    data, times, live_blocks = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times_us = sorted(t * 1e6 for t in times)
+    print(
+        f"{label:14s} callback mean {statistics.mean(times_us):6.2f} us, "
+        f"p99 {times_us[int(0.99 * (len(times_us) - 1))]:6.2f} us, max {times_us[-1]:7.2f} us | "
+        f"arrays held {live_blocks:5d} | peak {peak / 1e6:6.2f} MB "
+        f"(audio {data.nbytes / 1e6:.2f} MB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio capture buffering.")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--blocksize", type=int, default=512)
+    parser.add_argument(
+        "--initial-seconds",
+        type=float,
+        default=10.0,
+        help="Preallocated CaptureBuffer size (smaller values exercise growth).",
+    )
+    args = parser.parse_args()
+
+    n_blocks = int(args.seconds * SAMPLE_RATE / args.blocksize)
+    rng = np.random.default_rng(0)
+    float_blocks = [
+        (rng.standard_normal((args.blocksize, 1)) * 0.1).astype(np.float32) for _ in range(n_blocks)
+    ]
+    int_blocks = [(b * 32767).astype(np.int16) for b in float_blocks]
+
+    print(f"--- {args.seconds:.0f}s at {SAMPLE_RATE} Hz, {n_blocks} callbacks of {args.blocksize} frames ---")
+    _measure("queue+concat", legacy_capture, float_blocks)
+    _measure(
+        "CaptureBuffer", buffer_capture, int_blocks, int(args.initial_seconds * SAMPLE_RATE)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Accuracy/latency benchmark for the fingerprint engine on synthetic noisy clips.
+
+Builds a synthetic catalog (random melodies with harmonics), then cuts clips at
+random offsets, records them "through the air" (44.1 kHz, random gain, additive
+noise at several SNRs) and times fingerprint + lookup for each clip. Clips of
+songs that are not in the catalog measure the false positive rate.
+
+Usage:
+    python benchmark_fingerprint.py --songs 50 --clips 40 --clip-seconds 5
+    python benchmark_fingerprint.py --index fingerprint_db   # clips cut from the real catalog
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+import fingerprint
+
+RECORD_RATE = 44100
+
+
+def synthetic_song(rng: np.random.Generator, seconds: float) -> np.ndarray:
+    """A random melody with harmonics and a bass line, at fingerprint.SAMPLE_RATE."""
+    sr = fingerprint.SAMPLE_RATE
+    out = np.zeros(int(seconds * sr), dtype=np.float32)
+    position = 0
+
+    while position < len(out):
+        length = int(rng.uniform(0.12, 0.45) * sr)
+        t = np.arange(min(length, len(out) - position)) / sr
+        envelope = np.exp(-3.0 * t / max(t[-1], 1e-3)) if len(t) else t
+
+        for midi, gain in ((rng.integers(55, 84), 1.0), (rng.integers(36, 52), 0.5)):
+            f0 = 440.0 * 2 ** ((midi - 69) / 12)
+            for harmonic in range(1, 4):
+                out[position : position + len(t)] += (
+                    gain / harmonic * envelope * np.sin(2 * np.pi * f0 * harmonic * t)
+                ).astype(np.float32)
+        position += length
+
+    return out / np.abs(out).max()
+
+
+def degrade(rng: np.random.Generator, clip: np.ndarray, snr_db: float) -> np.ndarray:
+    """Simulates a microphone recording: 44.1 kHz int16, random gain, additive noise."""
+    upsampled = fingerprint.to_mono_float(clip, fingerprint.SAMPLE_RATE, RECORD_RATE)
+    signal_power = np.mean(upsampled**2)
+    noise = rng.standard_normal(len(upsampled)).astype(np.float32)
+    noise *= np.sqrt(signal_power / 10 ** (snr_db / 10))
+    recorded = rng.uniform(0.2, 0.8) * (upsampled + noise)
+    return (np.clip(recorded, -1, 1) * 32767).astype(np.int16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint identification.")
+    parser.add_argument("--songs", type=int, default=50)
+    parser.add_argument("--song-seconds", type=float, default=60.0)
+    parser.add_argument("--clips", type=int, default=40, help="Clips per SNR level.")
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--snr", type=float, nargs="*", default=[20.0, 10.0, 5.0, 0.0, -5.0])
+    parser.add_argument("--index", help="Use an existing index instead of a synthetic catalog.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    if args.index:
+        index = fingerprint.FingerprintIndex.load(args.index)
+        by_name = {song["music_name"]: song["source"] for song in index.songs}
+        catalog = [(name, fingerprint.load_audio(path)) for name, path in by_name.items()]
+    else:
+        catalog = [
+            (f"Synthetic Song {i}", synthetic_song(rng, args.song_seconds))
+            for i in range(args.songs)
+        ]
+        start = time.perf_counter()
+        index = fingerprint.FingerprintIndex.build([(name, "", s) for name, s in catalog])
+        build_time = time.perf_counter() - start
+        size_mb = (index.hashes.nbytes + index.entries.nbytes) / 1e6
+        print(
+            f"Indexed {len(catalog)} songs ({args.song_seconds:.0f}s each) in {build_time:.2f}s: "
+            f"{len(index.hashes)} hashes, {size_mb:.2f} MB"
+        )
+
+    clip_len = int(args.clip_seconds * fingerprint.SAMPLE_RATE)
+    print(f"\n--- {args.clips} clips of {args.clip_seconds:.1f}s per SNR level ---")
+
+    for snr in args.snr:
+        correct = 0
+        confident = 0
+        wrong_confident = 0
+        latencies = []
+
+        for _ in range(args.clips):
+            name, song = catalog[rng.integers(len(catalog))]
+            start = rng.integers(0, max(1, len(song) - clip_len))
+            recorded = degrade(rng, song[start : start + clip_len], snr)
+
+            t0 = time.perf_counter()
+            samples = fingerprint.to_mono_float(recorded, RECORD_RATE)
+            result = index.match(samples)
+            latencies.append(time.perf_counter() - t0)
+
+            if result and result["confident"]:
+                confident += 1
+                if result["music_name"] == name:
+                    correct += 1
+                else:
+                    wrong_confident += 1
+
+        latencies_ms = sorted(1000 * t for t in latencies)
+        print(
+            f"SNR {snr:5.1f} dB: accuracy {100 * correct / args.clips:5.1f}% "
+            f"(answered {confident}/{args.clips}, wrong {wrong_confident}) | "
+            f"latency mean {statistics.mean(latencies_ms):6.1f} ms, "
+            f"p95 {latencies_ms[int(0.95 * (len(latencies_ms) - 1))]:6.1f} ms"
+        )
+
+    if not args.index:
+        false_positives = 0
+        for _ in range(args.clips):
+            recorded = degrade(rng, synthetic_song(rng, args.clip_seconds), args.snr[0])
+            result = index.match(fingerprint.to_mono_float(recorded, RECORD_RATE))
+            false_positives += bool(result and result["confident"])
+        print(f"Songs not in the catalog: {false_positives}/{args.clips} false positives")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Time-to-identification benchmark for progressive (early-exit) song identification.
+
+Replays recorded WAV files through the same lyrics path used by detect_music in
+progressive mode (Groq STT on a sliding window + ChromaDB relevance scores), with
+a simulated clock: a step sees only the audio recorded so far, and the next step
+starts after the previous one finished, but at least PROGRESSIVE_STEP seconds later.
+
+The expected song is taken from the file name: billie_jean__take1.wav -> "Billie Jean".
+
+Reports accuracy, how often the search exits early, and time-to-identification,
+compared with the fixed 10-second window (--baseline also times the fixed path).
+
+Usage:
+    python benchmark_progressive_id.py recordings/*.wav --baseline
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+from scipy.io.wavfile import read
+
+import utils
+
+
+def expected_name(path):
+    stem = os.path.splitext(os.path.basename(path))[0].split("__")[0]
+    return stem.replace("_", " ").title()
+
+
+def load_int16(path):
+    rate, data = read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if data.dtype != np.int16:
+        if np.issubdtype(data.dtype, np.floating):
+            data = np.clip(data, -1.0, 1.0) * 32767
+        data = data.astype(np.int16)
+    return rate, data
+
+
+def simulate(vectorstore, rate, data, duration):
+    """Returns (identified name or None, time-to-identification in s, early exit flag, steps)."""
+    scorer = utils.ProgressiveLyricsScorer(vectorstore)
+    total = min(duration, len(data) / rate)
+    clock = utils.PROGRESSIVE_MIN_SECONDS
+
+    while True:
+        available = min(clock, total)
+        end = int(available * rate)
+        window = data[max(0, end - int(utils.PROGRESSIVE_WINDOW * rate)) : end]
+
+        t0 = time.perf_counter()
+        transcript = utils.transcribe_samples(window, rate)
+        if transcript:
+            scorer.update(transcript)
+        clock += time.perf_counter() - t0
+
+        identified = scorer.confident()
+        if identified:
+            return identified, clock, available < total, scorer.steps
+        if available >= total:
+            return None, None, False, scorer.steps
+
+        clock = max(clock, available + utils.PROGRESSIVE_STEP)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark progressive song identification.")
+    parser.add_argument("files", nargs="+", help="WAV recordings named after the expected song.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Maximum recording length (s).")
+    parser.add_argument(
+        "--baseline", action="store_true", help="Also time the fixed-window lyrics path."
+    )
+    args = parser.parse_args()
+
+    vectorstore = utils.load_vectorstore()
+    if not vectorstore:
+        return
+
+    rows = []
+    for path in args.files:
+        rate, data = load_int16(path)
+        expected = expected_name(path)
+        identified, time_to_id, early_exit, steps = simulate(vectorstore, rate, data, args.duration)
+
+        baseline = None
+        if args.baseline:
+            clip = data[: int(args.duration * rate)]
+            t0 = time.perf_counter()
+            baseline_name = utils.identify_by_lyrics(clip, rate)
+            baseline = (baseline_name, len(clip) / rate + time.perf_counter() - t0)
+
+        rows.append((expected, identified, time_to_id, early_exit, baseline))
+        print(
+            f"{os.path.basename(path)}: expected '{expected}', got '{identified}' "
+            f"after {steps} steps"
+            + (f" at {time_to_id:.2f}s" if time_to_id else "")
+            + (" (early exit)" if early_exit else "")
+        )
+
+    n = len(rows)
+    correct = sum(1 for expected, identified, *_ in rows if identified == expected)
+    early = sum(1 for r in rows if r[3])
+    times = [r[2] for r in rows if r[2] is not None]
+
+    print(f"\n--- Progressive identification over {n} recordings ---")
+    print(f"Accuracy: {correct}/{n}, early exits: {early}/{n} ({100 * early / n:.0f}%)")
+    if times:
+        print(
+            f"Time-to-identification: mean {statistics.mean(times):.2f}s, "
+            f"median {statistics.median(times):.2f}s (fixed window: {args.duration:.0f}s + identification)"
+        )
+
+    if args.baseline:
+        baseline_times = [r[4][1] for r in rows]
+        baseline_correct = sum(1 for r in rows if r[4][0] and r[4][0].lower() == r[0].lower())
+        print(
+            f"Fixed window baseline: accuracy {baseline_correct}/{n}, "
+            f"mean time {statistics.mean(baseline_times):.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
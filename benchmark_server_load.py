@@ -0,0 +1,116 @@
+"""
+Load test for server.py with simulated satellite clients.
+
+Each simulated client owns one session and sends a mix of short commands and long
+chat requests to /infer. Reports latency percentiles per request type, how many
+requests were rejected by admission control, and the server's scheduler stats.
+
+Usage:
+    python server.py --max-concurrency 1 --max-queue 8
+    python benchmark_server_load.py --clients 6 --requests 5
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import requests
+
+COMMANDS = [
+    "Turn on the light.",
+    "Turn off the light.",
+    "What's the temperature?",
+    "Pause the music.",
+    "Stop the music.",
+]
+
+CHATS = [
+    "Can you explain in a few sentences how a Raspberry Pi differs from a regular desktop computer?",
+    "Tell me a short story about a robot that learns to play the guitar in a small town.",
+    "What are some good habits to keep a home office comfortable during a hot summer afternoon?",
+]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def simulated_client(server_url, client_id, n_requests, chat_ratio, think_time, results, lock):
+    session_id = f"sim-{client_id}"
+    rng = random.Random(client_id)
+
+    for _ in range(n_requests):
+        kind = "chat" if rng.random() < chat_ratio else "command"
+        text = rng.choice(CHATS if kind == "chat" else COMMANDS)
+
+        start = time.perf_counter()
+        try:
+            reply = requests.post(
+                f"{server_url}/infer",
+                json={"session_id": session_id, "text": text},
+                timeout=300,
+            )
+            status = reply.status_code
+        except requests.RequestException:
+            status = None
+        latency = time.perf_counter() - start
+
+        with lock:
+            results.append((kind, status, latency))
+
+        time.sleep(rng.uniform(0, think_time))
+
+    requests.delete(f"{server_url}/sessions/{session_id}", timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local Alexa server.")
+    parser.add_argument("--server", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per client.")
+    parser.add_argument("--chat-ratio", type=float, default=0.3)
+    parser.add_argument("--think-time", type=float, default=2.0, help="Max pause between requests (s).")
+    args = parser.parse_args()
+
+    results = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=simulated_client,
+            args=(args.server, i, args.requests, args.chat_ratio, args.think_time, results, lock),
+        )
+        for i in range(args.clients)
+    ]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n--- Load Test: {args.clients} clients x {args.requests} requests ({elapsed:.1f}s) ---")
+    for kind in ("command", "chat"):
+        ok = [lat for k, status, lat in results if k == kind and status == 200]
+        rejected = sum(1 for k, status, _ in results if k == kind and status == 503)
+        failed = sum(1 for k, status, _ in results if k == kind and status not in (200, 503))
+        if not ok and not rejected and not failed:
+            continue
+        print(
+            f"{kind:8s} ok={len(ok):3d} rejected={rejected:3d} failed={failed:3d} "
+            f"p50={_percentile(ok, 50):6.2f}s p95={_percentile(ok, 95):6.2f}s "
+            f"mean={statistics.mean(ok) if ok else 0.0:6.2f}s"
+        )
+
+    print("\nServer stats:")
+    print(requests.get(f"{args.server}/stats", timeout=10).json())
+
+
+if __name__ == "__main__":
+    main()
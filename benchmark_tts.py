@@ -0,0 +1,91 @@
+"""
+Time-to-first-audio benchmark for the TTS output stage.
+
+Compares, for the fixed tool replies and a multi-sentence chat reply:
+  - cold:     sentence streaming with an empty cache (first sentence synthesized on demand)
+  - warm:     sentence streaming with the phrases already cached
+  - unstreamed: the whole reply synthesized at once before playback (no cache)
+
+Time-to-first-audio is the time from receiving the reply text until the first WAV
+is ready to play. With --play the audio is also played (useful to check voice and rate).
+
+Usage:
+    python benchmark_tts.py
+    python benchmark_tts.py --repeat 5 --play
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+import tts
+
+CHAT_REPLY = (
+    "The Raspberry Pi is a small single-board computer. "
+    "It was created to teach programming in schools. "
+    "Today it is used in robots, home automation and many hobby projects."
+)
+
+
+def time_to_first_audio(speaker, text):
+    """Seconds until the first sentence of `text` is available as a WAV file."""
+    t0 = time.perf_counter()
+    speaker.synthesize(tts.split_sentences(text)[0])
+    return time.perf_counter() - t0
+
+
+def time_unstreamed(speaker, text):
+    """Seconds until the whole reply is synthesized as a single WAV file."""
+    t0 = time.perf_counter()
+    speaker.synthesize(" ".join(tts.split_sentences(text)))
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS time-to-first-audio.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per phrase and mode.")
+    parser.add_argument("--rate", type=float, default=1.0, help="Speaking rate.")
+    parser.add_argument("--play", action="store_true", help="Also play each reply once.")
+    args = parser.parse_args()
+
+    phrases = tts.PRERENDER_PHRASES + [CHAT_REPLY]
+    results = {"cold": [], "warm": [], "unstreamed": []}
+
+    for _ in range(args.repeat):
+        cache_dir = tempfile.mkdtemp(prefix="tts_bench_")
+        try:
+            speaker = tts.TextToSpeech(rate=args.rate, cache_dir=cache_dir)
+            for phrase in phrases:
+                results["cold"].append(time_to_first_audio(speaker, phrase))
+                results["warm"].append(time_to_first_audio(speaker, phrase))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        cache_dir = tempfile.mkdtemp(prefix="tts_bench_")
+        try:
+            speaker = tts.TextToSpeech(rate=args.rate, cache_dir=cache_dir)
+            for phrase in phrases:
+                results["unstreamed"].append(time_unstreamed(speaker, phrase))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"\n--- Time-to-first-audio over {len(phrases)} replies x {args.repeat} runs ({speaker.engine}) ---")
+    for mode, times in results.items():
+        times_ms = sorted(1000 * t for t in times)
+        print(
+            f"{mode:>10}: mean {statistics.mean(times_ms):7.1f} ms, "
+            f"median {statistics.median(times_ms):7.1f} ms, "
+            f"p95 {times_ms[int(0.95 * (len(times_ms) - 1))]:7.1f} ms"
+        )
+
+    if args.play:
+        speaker = tts.TextToSpeech(rate=args.rate)
+        for phrase in phrases:
+            print(f"Playing: {phrase}")
+            speaker.speak(phrase)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark for the wake word front end against recorded WAV files.
+
+Streams each file through the same RingBuffer -> EnergyGate -> KeywordSpotter path
+used by WakeWordListener, hop by hop, and reports:
+    * CPU% of one core (process CPU time / audio duration)
+    * How often the gate let the model run (duty cycle)
+    * Detection latency: audio time from the speech onset (gate opening) to the
+      detection, plus the processing time of the detecting hop
+    * Recall on positive files and false alarms per hour on negative files
+
+Usage:
+    python benchmark_wake_word.py --positives recordings/wake --negatives recordings/background
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+from math import gcd
+
+import numpy as np
+from scipy.io.wavfile import read
+from scipy.signal import resample_poly
+
+import wake_word
+from audio_buffer import RingBuffer
+
+
+def load_wav(path: str, sample_rate: int = wake_word.SAMPLE_RATE) -> np.ndarray:
+    """Loads a WAV file as float32 mono at `sample_rate`."""
+    rate, data = read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data / float(np.iinfo(data.dtype).max)
+    data = data.astype(np.float32)
+
+    if rate != sample_rate:
+        g = gcd(rate, sample_rate)
+        data = resample_poly(data, sample_rate // g, rate // g).astype(np.float32)
+    return data
+
+
+def _collect(paths):
+    files = []
+    for path in paths or []:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.wav"))))
+        else:
+            files.append(path)
+    return files
+
+
+def run_file(path: str, spotter, threshold: float) -> dict:
+    """Streams one file through a fresh detector and collects timings."""
+    audio = load_wav(path)
+    sr = wake_word.SAMPLE_RATE
+    hop = wake_word.HOP_SIZE
+
+    ring = RingBuffer(4 * sr)
+    detector = wake_word.WakeWordDetector(spotter, threshold=threshold)
+
+    detections = []
+    hop_times = []
+    cpu_start = time.process_time()
+
+    for start in range(0, len(audio) - hop + 1, hop):
+        ring.write(audio[start : start + hop])
+
+        t0 = time.perf_counter()
+        fired = detector.process(ring)
+        hop_times.append(time.perf_counter() - t0)
+
+        if fired:
+            position = ring.total_written
+            onset = detector.onset if detector.onset is not None else position
+            detections.append((position - onset) / sr + hop_times[-1])
+
+    cpu_time = time.process_time() - cpu_start
+    duration = len(audio) / sr
+
+    return {
+        "duration": duration,
+        "cpu_time": cpu_time,
+        "hops": detector.hops,
+        "model_runs": detector.model_runs,
+        "hop_times": hop_times,
+        "detections": detections,
+    }
+
+
+def _summary(label, results):
+    duration = sum(r["duration"] for r in results)
+    cpu_time = sum(r["cpu_time"] for r in results)
+    hops = sum(r["hops"] for r in results) or 1
+    model_runs = sum(r["model_runs"] for r in results)
+    hop_ms = sorted(t * 1000 for r in results for t in r["hop_times"]) or [0.0]
+
+    print(f"\n[{label}] {len(results)} files, {duration:.1f}s of audio")
+    print(f"  CPU: {100 * cpu_time / max(duration, 1e-9):.2f}% of one core")
+    print(f"  Gate duty cycle: {100 * model_runs / hops:.1f}% of hops ran the model")
+    print(
+        f"  Per-hop time: mean {statistics.mean(hop_ms):.2f} ms, "
+        f"p95 {hop_ms[int(0.95 * (len(hop_ms) - 1))]:.2f} ms, max {hop_ms[-1]:.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wake word front end.")
+    parser.add_argument("--positives", nargs="*", help="WAV files/dirs containing the wake word.")
+    parser.add_argument("--negatives", nargs="*", help="WAV files/dirs without the wake word.")
+    parser.add_argument("--model", default=wake_word.MODEL_PATH)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    spotter = wake_word.KeywordSpotter(args.model)
+
+    positives = [run_file(p, spotter, args.threshold) for p in _collect(args.positives)]
+    negatives = [run_file(p, spotter, args.threshold) for p in _collect(args.negatives)]
+
+    if positives:
+        _summary("positives", positives)
+        hits = [r["detections"][0] for r in positives if r["detections"]]
+        print(f"  Recall: {len(hits)}/{len(positives)}")
+        if hits:
+            print(
+                f"  Detection latency (onset -> fire): mean {statistics.mean(hits):.2f}s, "
+                f"max {max(hits):.2f}s"
+            )
+
+    if negatives:
+        _summary("negatives", negatives)
+        false_alarms = sum(len(r["detections"]) for r in negatives)
+        hours = sum(r["duration"] for r in negatives) / 3600
+        print(f"  False alarms: {false_alarms} ({false_alarms / max(hours, 1e-9):.1f} per hour)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Builds the audio fingerprint index used by detect_music.
+
+Reads every audio file in the reference catalog directory (WAV natively; mp3, flac,
+ogg and m4a through ffmpeg) and writes the hash index to fingerprint_db/.
+The song name is taken from the file name, like the lyrics database:
+data/audio/billie_jean.mp3 -> "Billie Jean".
+
+Usage:
+    python create_fingerprint_database.py
+    python create_fingerprint_database.py --audio-dir /path/to/songs --output fingerprint_db --yes
+"""
+
+import argparse
+import os
+import time
+
+import fingerprint
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIO_DIR = os.path.join(BASE_DIR, "data", "audio")
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+
+
+def create_fingerprint_database(audio_dir, output):
+    """Fingerprint every song in audio_dir and persist the index to output"""
+    print("Creating fingerprint database...")
+
+    catalog = []
+    if os.path.exists(audio_dir):
+        print(f"Loading audio files from: {audio_dir}")
+        for root, dirs, files in os.walk(audio_dir):
+            for file in sorted(files):
+                if not file.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                file_path = os.path.join(root, file)
+                print(f"Loading file: {file}")
+                try:
+                    samples = fingerprint.load_audio(file_path)
+                except Exception as e:
+                    print(f"Error loading file {file}: {e}")
+                    continue
+
+                # Use the filename (without extension) as the music name
+                music_name = os.path.splitext(file)[0].replace("_", " ").title()
+                catalog.append((music_name, file_path, samples))
+    else:
+        print(f"Warning: Audio directory {audio_dir} not found")
+
+    if not catalog:
+        print("Error: No songs were loaded. Check file paths.")
+        return None
+
+    print(f"Total songs loaded: {len(catalog)}")
+
+    start_time = time.time()
+    index = fingerprint.FingerprintIndex.build(catalog)
+    index.save(output)
+    elapsed = time.time() - start_time
+
+    size_mb = (index.hashes.nbytes + index.entries.nbytes) / 1e6
+    print(f"Fingerprint database saved to {output}")
+    print(f"Total hashes indexed: {len(index.hashes)} ({size_mb:.2f} MB, {elapsed:.2f}s)")
+
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the audio fingerprint database.")
+    parser.add_argument("--audio-dir", default=AUDIO_DIR, help="Reference catalog directory.")
+    parser.add_argument("--output", default=fingerprint.FINGERPRINT_DIRECTORY)
+    parser.add_argument("--yes", action="store_true", help="Overwrite an existing database.")
+    args = parser.parse_args()
+
+    # Check if database already exists
+    if os.path.exists(args.output) and not args.yes:
+        choice = input(f"Database already exists at {args.output}. Recreate? (y/n): ")
+        if choice.lower() != "y":
+            print("Exiting without changes.")
+            return
+
+    create_fingerprint_database(args.audio_dir, args.output)
+    print("Database creation complete!")
+
+
+if __name__ == "__main__":
+    main()
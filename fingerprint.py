@@ -0,0 +1,264 @@
+"""
+Audio fingerprinting for song identification (no STT, no LLM).
+
+Songs are reduced to constellation maps: local maxima of the log spectrogram.
+Pairs of nearby peaks are packed into 32-bit hashes (anchor frequency, target
+frequency, time delta). The index stores every hash with the song and the anchor
+time, sorted by hash, as plain .npy arrays that are loaded memory-mapped.
+
+A recorded clip is matched by looking up its hashes and voting on
+(song, reference time - clip time): the true song piles up votes on one offset.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from math import gcd
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.io.wavfile import read
+from scipy.ndimage import maximum_filter
+from scipy.signal import resample_poly
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FINGERPRINT_DIRECTORY = os.path.join(BASE_DIR, "fingerprint_db")
+
+# Spectrogram
+SAMPLE_RATE = 11025  # 44100 / 4, enough bandwidth for the melody and harmonics
+N_FFT = 1024
+HOP = 256  # ~23 ms per frame
+FRAMES_PER_SECOND = SAMPLE_RATE / HOP
+
+# Peak picking
+PEAK_NEIGHBORHOOD = (15, 11)  # (frequency bins, frames)
+PEAKS_PER_SECOND = 30
+
+# Peak pairing
+FAN_OUT = 10  # Targets paired with each anchor
+MAX_DT = 63  # Frames (6 bits)
+
+# Packing
+FREQ_BITS = 9
+DT_BITS = 6
+OFFSET_BITS = 18  # Anchor frame, ~100 minutes per song
+MAX_SONGS = 2 ** (32 - OFFSET_BITS)
+
+# Matching
+MIN_VOTES = 12  # Aligned hashes needed to accept a match
+MIN_RATIO = 3.0  # Best song must have this many times the votes of the runner-up
+
+
+def load_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Loads an audio file as float32 mono at `sample_rate`.
+    WAV is read directly; other formats (mp3, flac, ...) are decoded with ffmpeg.
+    """
+    if path.lower().endswith(".wav"):
+        rate, data = read(path)
+        return to_mono_float(data, rate, sample_rate)
+
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError(f"ffmpeg is required to decode {path}")
+
+    command = ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1"]
+    pcm = subprocess.run(
+        command + ["-ar", str(sample_rate), "-"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def to_mono_float(data: np.ndarray, rate: int, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Converts int16/float samples at `rate` to float32 mono at `sample_rate`."""
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / float(np.iinfo(data.dtype).max)
+    data = data.astype(np.float32, copy=False)
+
+    if rate != sample_rate:
+        g = gcd(rate, sample_rate)
+        data = resample_poly(data, sample_rate // g, rate // g).astype(np.float32)
+    return data
+
+
+def spectrogram(samples: np.ndarray) -> np.ndarray:
+    """Log-magnitude spectrogram of shape (N_FFT // 2 + 1, frames)."""
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(N_FFT).astype(np.float32), axis=1))
+    return np.log(spectrum.T + 1e-6).astype(np.float32)
+
+
+def find_peaks(spec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Picks spectrogram peaks: local maxima, keeping the strongest PEAKS_PER_SECOND
+    in every one-second slice so loud passages do not crowd out quiet ones.
+
+    Returns:
+        (frames, bins): Peak coordinates sorted by time, then frequency.
+    """
+    is_peak = (spec == maximum_filter(spec, size=PEAK_NEIGHBORHOOD)) & (spec > spec.mean())
+    bins, frames = np.nonzero(is_peak)
+    magnitudes = spec[bins, frames]
+
+    # Rank peaks inside each one-second slice by magnitude and keep the top ones
+    slices = (frames / FRAMES_PER_SECOND).astype(np.int64)
+    order = np.lexsort((-magnitudes, slices))
+    slices_sorted = slices[order]
+    first_in_slice = np.searchsorted(slices_sorted, slices_sorted, side="left")
+    rank = np.arange(len(order)) - first_in_slice
+    keep = order[rank < PEAKS_PER_SECOND]
+
+    frames, bins = frames[keep], bins[keep]
+    order = np.lexsort((bins, frames))
+    return frames[order], bins[order]
+
+
+def hash_peaks(frames: np.ndarray, bins: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs every peak (anchor) with the next FAN_OUT peaks and packs each pair into
+    a uint32 hash: anchor bin | target bin | time delta.
+
+    Returns:
+        (hashes, offsets): uint32 hashes and the anchor frame of each hash.
+    """
+    bins = np.minimum(bins, 2**FREQ_BITS - 1).astype(np.uint32)
+    hashes = []
+    offsets = []
+
+    for k in range(1, FAN_OUT + 1):
+        if len(frames) <= k:
+            break
+        dt = frames[k:] - frames[:-k]
+        valid = (dt > 0) & (dt <= MAX_DT)
+        anchor = bins[:-k][valid]
+        target = bins[k:][valid]
+        hashes.append(
+            (anchor << (FREQ_BITS + DT_BITS)) | (target << DT_BITS) | dt[valid].astype(np.uint32)
+        )
+        offsets.append(frames[:-k][valid])
+
+    if not hashes:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+    return np.concatenate(hashes), np.concatenate(offsets).astype(np.int64)
+
+
+def fingerprint(samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashes for float32 mono samples at SAMPLE_RATE."""
+    return hash_peaks(*find_peaks(spectrogram(samples)))
+
+
+class FingerprintIndex:
+    """
+    Hash index over the reference catalog.
+
+    Storage (one directory):
+        hashes.npy   uint32, sorted
+        entries.npy  uint32, song id << OFFSET_BITS | anchor frame
+        songs.json   song names and source files
+    """
+
+    def __init__(self, hashes: np.ndarray, entries: np.ndarray, songs: List[Dict[str, str]]):
+        self.hashes = hashes
+        self.entries = entries
+        self.songs = songs
+
+    @classmethod
+    def build(cls, catalog: List[Tuple[str, str, np.ndarray]]) -> "FingerprintIndex":
+        """
+        Builds an index from (music name, source path, samples at SAMPLE_RATE) tuples.
+        """
+        if len(catalog) > MAX_SONGS:
+            raise ValueError(f"At most {MAX_SONGS} songs fit in the index.")
+
+        all_hashes = []
+        all_entries = []
+        songs = []
+
+        for song_id, (name, source, samples) in enumerate(catalog):
+            hashes, offsets = fingerprint(samples)
+            if len(offsets) and offsets.max() >= 2**OFFSET_BITS:
+                raise ValueError(f"'{name}' is too long to index.")
+            all_hashes.append(hashes)
+            all_entries.append((np.uint32(song_id) << OFFSET_BITS) | offsets.astype(np.uint32))
+            songs.append({"music_name": name, "source": source})
+
+        hashes = np.concatenate(all_hashes) if all_hashes else np.empty(0, dtype=np.uint32)
+        entries = np.concatenate(all_entries) if all_entries else np.empty(0, dtype=np.uint32)
+        order = np.argsort(hashes, kind="stable")
+        return cls(hashes[order], entries[order], songs)
+
+    def save(self, directory: str = FINGERPRINT_DIRECTORY):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "hashes.npy"), self.hashes)
+        np.save(os.path.join(directory, "entries.npy"), self.entries)
+        with open(os.path.join(directory, "songs.json"), "w", encoding="utf-8") as f:
+            json.dump(self.songs, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str = FINGERPRINT_DIRECTORY) -> "FingerprintIndex":
+        """Loads the index memory-mapped: only the pages touched by lookups are read."""
+        hashes = np.load(os.path.join(directory, "hashes.npy"), mmap_mode="r")
+        entries = np.load(os.path.join(directory, "entries.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "songs.json"), encoding="utf-8") as f:
+            songs = json.load(f)
+        return cls(hashes, entries, songs)
+
+    def match(self, samples: np.ndarray) -> Optional[Dict[str, object]]:
+        """
+        Identifies a clip by offset-histogram voting.
+
+        Args:
+            samples (np.ndarray): float32 mono samples at SAMPLE_RATE.
+
+        Returns:
+            dict: music_name, votes, runner_up_votes, offset_seconds and confident,
+            or None if no hash matched at all.
+        """
+        query_hashes, query_offsets = fingerprint(samples)
+        if not len(query_hashes):
+            return None
+
+        left = np.searchsorted(self.hashes, query_hashes, side="left")
+        right = np.searchsorted(self.hashes, query_hashes, side="right")
+        counts = right - left
+        total = int(counts.sum())
+        if total == 0:
+            return None
+
+        # Expand every query hash into the index rows [left, right) without a Python loop
+        query_row = np.repeat(np.arange(len(query_hashes)), counts)
+        run_start = np.repeat(np.cumsum(counts) - counts, counts)
+        index_rows = np.repeat(left, counts) + (np.arange(total) - run_start)
+
+        entries = np.asarray(self.entries[index_rows]).astype(np.int64)
+        song_ids = entries >> OFFSET_BITS
+        deltas = (entries & (2**OFFSET_BITS - 1)) - query_offsets[query_row]
+
+        # Vote on (song, delta); neighbouring deltas are merged to absorb one-frame jitter
+        span = 2 ** (OFFSET_BITS + 1)
+        keys, votes = np.unique(song_ids * span + (deltas + 2**OFFSET_BITS), return_counts=True)
+        neighbour = np.searchsorted(keys, keys + 1)
+        has_neighbour = (neighbour < len(keys)) & (keys[np.minimum(neighbour, len(keys) - 1)] == keys + 1)
+        votes = votes + np.where(has_neighbour, votes[np.minimum(neighbour, len(keys) - 1)], 0)
+
+        key_songs = keys // span
+        best = int(np.argmax(votes))
+        best_song = int(key_songs[best])
+        others = votes[key_songs != best_song]
+        runner_up = int(others.max()) if len(others) else 0
+        best_votes = int(votes[best])
+
+        return {
+            "music_name": self.songs[best_song]["music_name"],
+            "votes": best_votes,
+            "runner_up_votes": runner_up,
+            "offset_seconds": float((keys[best] % span - 2**OFFSET_BITS) / FRAMES_PER_SECOND),
+            "confident": best_votes >= MIN_VOTES and best_votes >= MIN_RATIO * max(runner_up, 1),
+        }
@@ -2,6 +2,7 @@ import logging
 from gpiozero import LED
 import adafruit_dht
 import board
+import replies
 
 
 # Configure logging to simulate system output
@@ -38,10 +39,10 @@ def control_light(status: str) -> str:
         # test to see if the led is really on
         if ledGrn.is_lit:
             logger.info("LIGHT TURNED ON (GPIO LOW)")
-            return "The light has been turned on successfully."
+            return replies.LIGHT_ON_REPLY
 
         logger.error("Failed to turn on the light.")
-        return "Error: Failed to turn on the light."
+        return replies.LIGHT_ON_ERROR_REPLY
 
     elif status == "off":
         _system_state["light_status"] = "off"
@@ -50,10 +51,10 @@ def control_light(status: str) -> str:
 
         if not ledGrn.is_lit:
             logger.info("🌑 LIGHT TURNED OFF (GPIO HIGH)")
-            return "The light has been turned off successfully."
+            return replies.LIGHT_OFF_REPLY
 
         logger.error("Failed to turn off the light.")
-        return "Error: Failed to turn off the light."
+        return replies.LIGHT_OFF_ERROR_REPLY
 
     else:
         error_msg = f"Error: Invalid status '{status}'. Use 'on' or 'off'."
@@ -80,4 +81,4 @@ def get_environment_metrics(location: str = "indoor") -> str:
         # Errors happen fairly often, DHT's are hard to read,
         # just keep going
         logger.error(f"Runtime error reading sensor: {error.args[0]}")
-        return "Error: Failed to read from the sensor."
+        return replies.SENSOR_ERROR_REPLY
@@ -1,13 +1,26 @@
 import ollama
 import logging
-from typing import List, Dict, Any, Optional
+import contextlib
+import json
+import threading
+import time
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import hardware
+import replies
 import tools_schema
 import utils
 import os
+import scheduler as ollama_scheduler
 
 # Configuration
-MODEL_NAME = "llama3.2"  # Ensure this model is pulled: `ollama pull llama3.2`
+# Large tier: escalations and free-form chat. Ensure this model is pulled: `ollama pull llama3.2`
+MODEL_NAME = "llama3.2"
+# Fast tier: first-pass tool dispatch. Ensure this model is pulled: `ollama pull llama3.2:1b`
+FAST_MODEL_NAME = "llama3.2:1b"
+# Fast-tier decisions below this self-reported confidence are escalated to the large tier
+ROUTER_CONFIDENCE_THRESHOLD = 0.7
+# Recent user/assistant turns shown to the router
+ROUTER_HISTORY_TURNS = 6
 
 # Logger setup
 logging.basicConfig(
@@ -15,6 +28,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Optional request scheduler. When set (server mode), every Ollama call is queued through it
+# so several sessions can share one model without overloading the Pi.
+scheduler: Optional[ollama_scheduler.OllamaScheduler] = None
+
 # Function Mapping: Connects string names from LLM to actual Python functions
 AVAILABLE_FUNCTIONS = {
     "control_light": hardware.control_light,
@@ -25,26 +42,335 @@ AVAILABLE_FUNCTIONS = {
     "detect_music": utils.detect_music,
 }
 
+# Tools that act on the room itself (GPIO, sensors, microphone, speakers). In server mode
+# they are handed to a `delegate` and run on the satellite in the user's room.
+ROOM_TOOLS = {
+    "control_light",
+    "get_environment_metrics",
+    "tocar_musica",
+    "pausar_retomar",
+    "parar_musica",
+    "detect_music",
+}
+
+# Tools whose result is already the final reply: returned as-is, without a second LLM call.
+# Their replies are fixed strings, so the TTS cache can play them instantly.
+DIRECT_RESPONSE_TOOLS = {
+    "control_light",
+    "detect_music",
+    "tocar_musica",
+    "pausar_retomar",
+    "parar_musica",
+}
+
+TOOL_DEFINITIONS = {
+    tool["function"]["name"]: tool["function"]
+    for tool in tools_schema.available_tools_definitions
+}
+
+ROUTER_PROMPT = {
+    "role": "system",
+    "content": (
+        "You are the command router of a voice assistant running on a Raspberry Pi. "
+        "Pick the single tool that handles the user's LAST message, or 'chat' if it is a "
+        "question or conversation that no tool handles. Fill 'arguments' with the tool "
+        "parameters and rate your 'confidence' from 0 to 1.\n"
+        "Tools:\n"
+        + "\n".join(
+            f"- {name}({', '.join(tool['parameters']['properties'])}): {tool['description']}"
+            for name, tool in TOOL_DEFINITIONS.items()
+        )
+        + "\nRules:\n"
+        + tools_schema.tool_usage_rules
+    ),
+}
+
+# Per-tier latency and escalation counters (see get_tier_stats)
+_stats_lock = threading.Lock()
+_tier_stats = {
+    "requests": 0,
+    "fast": {"calls": 0, "latency_total": 0.0},
+    "large": {"calls": 0, "latency_total": 0.0},
+    "escalations": {"low_confidence": 0, "malformed": 0, "chat": 0, "fast_error": 0},
+}
+
+
+def _chat(priority: int, **kwargs) -> Dict[str, Any]:
+    """Calls ollama.chat directly, or through the scheduler when one is configured."""
+    if scheduler is None:
+        return ollama.chat(**kwargs)
+    return scheduler.submit(ollama.chat, priority=priority, **kwargs)
+
+
+def _timed_chat(tier: str, priority: int, **kwargs) -> Dict[str, Any]:
+    """Calls the model and records the latency of the call under its tier."""
+    start_time = time.perf_counter()
+    response = _chat(priority, **kwargs)
+    latency = time.perf_counter() - start_time
+
+    with _stats_lock:
+        _tier_stats[tier]["calls"] += 1
+        _tier_stats[tier]["latency_total"] += latency
+    logger.info(f"[{tier} tier] {kwargs['model']} answered in {latency:.2f}s")
+    return response
+
 
-def run_inference(user_input: str, conversation_history: List[Dict[str, Any]]) -> str:
+def get_tier_stats() -> Dict[str, Any]:
+    """
+    Returns per-tier call counts and average latency, and the escalation rate
+    (share of requests the fast tier handed to the large tier) with its reasons.
+    """
+    with _stats_lock:
+        requests = _tier_stats["requests"]
+        escalations = dict(_tier_stats["escalations"])
+        stats = {"requests": requests}
+        for tier in ("fast", "large"):
+            calls = _tier_stats[tier]["calls"]
+            stats[tier] = {
+                "calls": calls,
+                "avg_latency_s": round(_tier_stats[tier]["latency_total"] / (calls or 1), 3),
+            }
+        stats["escalations"] = escalations
+        stats["escalation_rate"] = round(sum(escalations.values()) / (requests or 1), 3)
+        return stats
+
+
+def _validate_tool_call(name: str, arguments: Any) -> Optional[Dict[str, Any]]:
+    """
+    Checks a tool call against its schema.
+
+    Returns:
+        dict: The arguments (unknown keys dropped), or None if the call is invalid.
+    """
+    tool = TOOL_DEFINITIONS.get(name)
+    if tool is None or name not in AVAILABLE_FUNCTIONS or not isinstance(arguments, dict):
+        return None
+
+    properties = tool["parameters"]["properties"]
+    arguments = {key: value for key, value in arguments.items() if key in properties}
+
+    for key in tool["parameters"].get("required", []):
+        if key not in arguments:
+            return None
+
+    for key, value in arguments.items():
+        spec = properties[key]
+        if spec.get("type") == "string" and not isinstance(value, str):
+            return None
+        if "enum" in spec and value not in spec["enum"]:
+            return None
+
+    return arguments
+
+
+def _route(
+    conversation_history: List[Dict[str, Any]], priority: int
+) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+    """
+    First pass on the fast tier: schema-constrained JSON tool selection.
+
+    Returns:
+        tuple: (tool name, arguments, None) when the fast tier can handle the request,
+        or (None, None, escalation reason) when it must go to the large tier.
+    """
+    recent = [
+        {"role": message["role"], "content": message["content"]}
+        for message in conversation_history
+        if message.get("role") in ("user", "assistant") and message.get("content")
+    ][-ROUTER_HISTORY_TURNS:]
+
+    try:
+        response = _timed_chat(
+            "fast",
+            priority,
+            model=FAST_MODEL_NAME,
+            messages=[ROUTER_PROMPT] + recent,
+            format=tools_schema.router_output_schema,
+            options={"temperature": 0},
+        )
+    except ollama_scheduler.SchedulerBusy:
+        raise
+    except Exception as e:
+        # e.g. the fast model is not pulled, or Ollama timed out: the large tier still works
+        logger.warning(f"Fast tier call failed: {e}")
+        return None, None, "fast_error"
+
+    try:
+        decision = json.loads(response["message"]["content"])
+        tool = decision["tool"]
+        confidence = float(decision["confidence"])
+    except (ValueError, KeyError, TypeError):
+        return None, None, "malformed"
+
+    if tool == "chat":
+        return None, None, "chat"
+
+    arguments = _validate_tool_call(tool, decision.get("arguments", {}))
+    if arguments is None:
+        return None, None, "malformed"
+
+    if confidence < ROUTER_CONFIDENCE_THRESHOLD:
+        return None, None, "low_confidence"
+
+    return tool, arguments, None
+
+
+def _direct_reply(
+    conversation_history: List[Dict[str, Any]], tool_output: str, reply: str
+) -> str:
+    """
+    Closes a tool turn that skips the final LLM call: records the tool result and the
+    reply in the history, so later turns (and the router) still see what happened.
+    """
+    conversation_history.append({"role": "tool", "content": tool_output})
+    conversation_history.append({"role": "assistant", "content": reply})
+    return reply
+
+
+def _execute_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    conversation_history: List[Dict[str, Any]],
+    delegate: Optional[Callable[[str, Dict[str, Any]], str]] = None,
+) -> Optional[str]:
+    """
+    Executes the tools requested by the model and feeds the results back into the history.
+    With a `delegate`, ROOM_TOOLS are handed to it instead of being executed here, and
+    its return value is the reply.
+
+    Returns:
+        str: A response to return immediately (DIRECT_RESPONSE_TOOLS), or None to continue.
+    """
+    for tool in tool_calls:
+        function_name = tool["function"]["name"]
+        arguments = tool["function"]["arguments"]
+
+        if delegate and function_name in ROOM_TOOLS:
+            logger.info(f"Delegating tool: {function_name} with args: {arguments}")
+            reply = delegate(function_name, arguments)
+            return _direct_reply(
+                conversation_history, f"{function_name} was sent to the room's device.", reply
+            )
+
+        logger.info(f"Executing tool: {function_name} with args: {arguments}")
+
+        function_to_call = AVAILABLE_FUNCTIONS.get(function_name)
+
+        if function_to_call:
+            # Execute the actual hardware function
+            function_response = function_to_call(**arguments)  # type: ignore
+
+            # SPECIAL CASE: If detect_music (or another direct response tool) was called,
+            # return immediately. The user wants to "kill" the inference loop here and use
+            # the hardcoded response.
+            if function_name in DIRECT_RESPONSE_TOOLS:
+                return _direct_reply(
+                    conversation_history, str(function_response), str(function_response)
+                )
+
+            # Feed the result back to the model
+            conversation_history.append(
+                {
+                    "role": "tool",
+                    "content": str(function_response),
+                }
+            )
+        else:
+            logger.error(f"Function {function_name} not found in function map.")
+            conversation_history.append(
+                {
+                    "role": "tool",
+                    "content": f"Error: Tool {function_name} implementation missing.",
+                }
+            )
+
+    return None
+
+
+def run_inference(
+    user_input: str,
+    conversation_history: List[Dict[str, Any]],
+    priority: Optional[int] = None,
+    delegate: Optional[Callable[[str, Dict[str, Any]], str]] = None,
+) -> str:
     """
     Orchestrates the conversation flow: User Input -> LLM -> Tool Execution -> Final Response.
 
+    The fast tier (FAST_MODEL_NAME) selects the tool first. The request is escalated to
+    the large tier (MODEL_NAME) on low confidence, malformed output, free-form chat, or
+    when the fast tier call itself fails.
+
     Args:
         user_input (str): The text input from the user (or STT system).
         conversation_history (List[Dict]): The context/history of the session.
+        priority (int, optional): Scheduling priority for the Ollama calls.
+            Defaults to a classification of the input length.
+        delegate (callable, optional): Called as delegate(tool_name, arguments) instead of
+            executing ROOM_TOOLS locally (server mode); returns the reply.
 
     Returns:
         str: The final natural language response from the Assistant.
+
+    Raises:
+        SchedulerBusy: If a scheduler is configured and rejects the request.
     """
+    if priority is None:
+        priority = ollama_scheduler.classify_priority(user_input)
 
+    # Admission control happens once, before anything runs: an admitted request keeps its
+    # slot for every model call below, so it cannot be rejected after a tool has executed.
+    admission = scheduler.admit(priority) if scheduler else contextlib.nullcontext()
+    with admission:
+        return _run_admitted(user_input, conversation_history, priority, delegate)
+
+
+def _run_admitted(
+    user_input: str,
+    conversation_history: List[Dict[str, Any]],
+    priority: int,
+    delegate: Optional[Callable[[str, Dict[str, Any]], str]],
+) -> str:
+    """The body of run_inference, executed while holding a scheduler slot (if any)."""
     # 1. Append user input to history
     conversation_history.append({"role": "user", "content": user_input})
     logger.info(f"Processing user input: {user_input}")
 
+    with _stats_lock:
+        _tier_stats["requests"] += 1
+
     try:
-        # 2. First Call to LLM: Intent Classification & Tool Selection
-        response = ollama.chat(
+        # 2. Fast tier: Tool Selection with schema-constrained JSON output
+        tool_name, arguments, escalation = _route(conversation_history, priority)
+
+        if tool_name:
+            logger.info(f"Fast tier selected tool: {tool_name}")
+            tool_calls = [{"function": {"name": tool_name, "arguments": arguments}}]
+
+            # Append the model's intent to history (critical for context)
+            conversation_history.append(
+                {"role": "assistant", "content": "", "tool_calls": tool_calls}
+            )
+
+            direct_response = _execute_tool_calls(tool_calls, conversation_history, delegate)
+            if direct_response is not None:
+                return direct_response
+
+            # Final natural language response, still on the fast tier
+            final_response = _timed_chat(
+                "fast",
+                priority,
+                model=FAST_MODEL_NAME,
+                messages=conversation_history,
+            )
+            return final_response["message"]["content"]
+
+        logger.info(f"Escalating to the large tier ({escalation}).")
+        with _stats_lock:
+            _tier_stats["escalations"][escalation] += 1
+
+        # 3. Large tier: Intent Classification & Tool Selection
+        response = _timed_chat(
+            "large",
+            priority,
             model=MODEL_NAME,
             messages=conversation_history,
             tools=tools_schema.available_tools_definitions,
@@ -52,49 +378,24 @@ def run_inference(user_input: str, conversation_history: List[Dict[str, Any]]) -
 
         message = response["message"]
 
-        # 3. Check for Tool Calls
+        # 4. Check for Tool Calls
         if message.get("tool_calls"):
             logger.info("Tool usage detected by the model.")
 
             # Append the model's intent to history (critical for context)
             conversation_history.append(message)
 
-            # 4. Execute Tools
-            for tool in message["tool_calls"]:
-                function_name = tool["function"]["name"]
-                arguments = tool["function"]["arguments"]
-
-                logger.info(f"Executing tool: {function_name} with args: {arguments}")
-
-                function_to_call = AVAILABLE_FUNCTIONS.get(function_name)
-
-                if function_to_call:
-                    # Execute the actual hardware function
-                    function_response = function_to_call(**arguments)  # type: ignore
-
-                    # SPECIAL CASE: If detect_music was called, return immediately.
-                    # The user wants to "kill" the inference loop here and use the hardcoded response.
-                    if function_name == "detect_music":
-                        return str(function_response)
-
-                    # 5. Feed the result back to the model
-                    conversation_history.append(
-                        {
-                            "role": "tool",
-                            "content": str(function_response),
-                        }
-                    )
-                else:
-                    logger.error(f"Function {function_name} not found in function map.")
-                    conversation_history.append(
-                        {
-                            "role": "tool",
-                            "content": f"Error: Tool {function_name} implementation missing.",
-                        }
-                    )
+            # 5. Execute Tools
+            direct_response = _execute_tool_calls(
+                message["tool_calls"], conversation_history, delegate
+            )
+            if direct_response is not None:
+                return direct_response
 
             # 6. Second Call to LLM: Generate Final Natural Language Response
-            final_response = ollama.chat(
+            final_response = _timed_chat(
+                "large",
+                priority,
                 model=MODEL_NAME,
                 messages=conversation_history,
             )
@@ -106,11 +407,11 @@ def run_inference(user_input: str, conversation_history: List[Dict[str, Any]]) -
 
             # Filtro de segurança simples: Se começar com chave {, provavelmente é alucinação de JSON
             if content.strip().startswith("{") and "parameters" in content:
-                return "I'm sorry, I tried to access a tool that doesn't exist. Could you try rephrasing? (Internal Error)"
+                return replies.UNKNOWN_TOOL_REPLY
 
             conversation_history.append(message)
             return message["content"]
 
     except Exception as e:
         logger.error(f"Inference pipeline failed: {e}")
-        return "I encountered an internal error while processing your request."
+        return replies.INTERNAL_ERROR_REPLY
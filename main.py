@@ -1,6 +1,11 @@
+import argparse
+import contextlib
 import os
 import sys
+import threading
 import inference
+import recording
+import tools_schema
 import utils
 from gpiozero import Button
 
@@ -8,11 +13,7 @@ SYSTEM_PROMPT = {
     "role": "AI Assistant",
     "content": (
         "You are a local AI assistant running on a Raspberry Pi that acts like Alexa. "
-        "### RULES FOR INTERACTIONS: \n"
-        "when the user asks to turn on or off the light, use the 'control_light'.\n"
-        "when the user asks about temperature or humidity, use the 'get_environment_metrics'.\n"
-        "when the user asks to play (NOT IDENTIFY), pause, resume, or stop music, use 'tocar_musica', 'pausar_retomar', or 'parar_musica' respectively.\n"
-        "when the user asks to identify a song, use the 'detect_music' function.\n"
+        "### RULES FOR INTERACTIONS: \n" + tools_schema.tool_usage_rules
     ),
 }
 
@@ -20,20 +21,66 @@ SYSTEM_PROMPT = {
 def main():
     """
     Main application loop.
-    Simulates the STT -> Inference -> TTS pipeline in the terminal.
+    Runs the STT -> Inference -> TTS pipeline.
     """
+    parser = argparse.ArgumentParser(description="Local Alexa (Edge AI Prototype).")
+    parser.add_argument(
+        "--wake-word",
+        action="store_true",
+        help="Hands-free mode: listen for the wake word instead of the button.",
+    )
+    parser.add_argument(
+        "--no-tts",
+        action="store_true",
+        help="Only print the replies (no speech output).",
+    )
+    args = parser.parse_args()
+
     history = [SYSTEM_PROMPT]
 
-    # Initialize Button
-    button = Button(20)
+    speaker = None
+    if not args.no_tts:
+        import tts
+
+        try:
+            speaker = tts.TextToSpeech()
+            # Fixed tool replies are rendered in the background so startup is not delayed
+            threading.Thread(
+                target=speaker.prerender, args=(tts.PRERENDER_PHRASES,), daemon=True
+            ).start()
+        except RuntimeError as e:
+            print(f"TTS disabled: {e}")
+
+    # Index the local music library in the background so the first "play" does not wait for it
+    threading.Thread(target=utils.load_music_library, daemon=True).start()
+
+    button = None
+    listener = None
+
+    if args.wake_word:
+        try:
+            import wake_word
+
+            listener = wake_word.WakeWordListener()
+            listener.start()
+        except Exception as e:
+            # e.g. no model at WAKE_WORD_MODEL, onnxruntime missing, or no input device
+            print(f"Wake word mode disabled: {e}")
+            print("Falling back to the button (see 'Hands-free Wake Word Mode' in the README).")
+            listener = None
 
     print("\n--- Local Alexa (Edge AI Prototype) Initialized ---")
-    print("Press the BUTTON (GPIO 20) to start recording.")
+    if listener:
+        print("Say the WAKE WORD to start recording.")
+    else:
+        # Initialize Button
+        button = Button(20)
+        print("Press the BUTTON (GPIO 20) to start recording.")
     print("Press Ctrl+C to stop.\n")
 
     # print("\n--- Audio Recording Test ---")
 
-    # audio_path = utils.record_audio(duration=5)
+    # audio_path = recording.record_audio(duration=5)
     # print(f"Audio recorded and saved to: {audio_path}")
 
     # transcribed_text = utils.transcribe_audio(audio_path)
@@ -51,12 +98,20 @@ def main():
 
     while True:
         try:
-            # Wait for Button to start recording
-            print("Waiting for button press...")
-            button.wait_for_press()
-
-            # Record while button is held
-            audio_path = utils.record_audio(button=button)
+            if listener:
+                # Wait for the wake word, then record until silence (with pre-roll)
+                print("Waiting for wake word...")
+                audio_path = listener.listen()
+            else:
+                # Wait for Button to start recording
+                print("Waiting for button press...")
+                button.wait_for_press()
+
+                # Record while button is held
+                audio_path = recording.record_audio(button=button)
+
+            if not audio_path:
+                continue
             print(f"Audio recorded and saved to: {audio_path}")
 
             user_text = utils.transcribe_audio(audio_path)
@@ -71,14 +126,25 @@ def main():
             if not user_text or not user_text.strip():
                 continue
 
-            # Core Inference
-            ai_response = inference.run_inference(user_text, history)
-
-            # Output Simulation (This will be replaced by the TTS module later)
-            print(f"ALEXA: {ai_response}\n")
+            # The wake word listener releases the microphone while tools run and the reply
+            # is spoken: detect_music opens its own stream, and ALEXA should not hear itself
+            with listener.paused() if listener else contextlib.nullcontext():
+                # Core Inference
+                ai_response = inference.run_inference(user_text, history)
+
+                # Output: print and speak the reply (sentence by sentence, cached audio)
+                print(f"ALEXA: {ai_response}\n")
+                if speaker:
+                    try:
+                        speaker.speak(ai_response)
+                    except Exception as e:
+                        # e.g. a PortAudio error: the reply was already printed, keep going
+                        print(f"Error during speech output: {e}")
 
         except KeyboardInterrupt:
             print("\nForced shutdown.")
+            if listener:
+                listener.stop()
             sys.exit(0)
 
 
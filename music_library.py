@@ -0,0 +1,378 @@
+"""
+Local music library, searched before YouTube.
+
+The music directory is scanned once, the tags (title, artist, album) of every audio
+file are read with mutagen, and the result is kept in a JSON index on disk. Later
+scans only re-read files whose size or modification time changed, and a watcher
+thread (watchfiles) applies additions, edits and deletions while the assistant runs.
+
+Queries like "billie jean by michael jackson" are split into a title part and an
+artist part: an artist name said at the start or the end of the query is removed
+(fuzzily), and what remains must match the track title with a fuzzy score (character
+similarity or word overlap, whichever is higher), so small transcription errors still
+hit. The artist only breaks ties: owning other songs by an artist never makes a song
+you don't own match.
+
+Usage:
+    python music_library.py --rescan
+    python music_library.py "billie jean"
+"""
+
+import argparse
+import difflib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import mutagen
+import watchfiles
+
+# Logger setup
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - [LIBRARY] - %(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("watchfiles").setLevel(logging.WARNING)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MUSIC_LIBRARY_DIR = os.path.expanduser(os.environ.get("MUSIC_LIBRARY_DIR", "~/Music"))
+LIBRARY_INDEX_PATH = os.path.join(BASE_DIR, "music_library.json")
+AUDIO_EXTENSIONS = (".mp3", ".flac", ".ogg", ".opus", ".m4a", ".wav")
+
+# Minimum fuzzy score (0-1) for a local hit; below it the query goes to YouTube
+MATCH_THRESHOLD = 0.75
+
+# Filler words from spoken requests, ignored on both sides of the match
+_FILLER_WORDS = {"by", "de", "da", "do", "song", "music", "musica", "play", "toca", "tocar"}
+_BRACKETS = re.compile(r"[\(\[][^\)\]]*[\)\]]")  # "(Remastered 2011)", "[Live]"
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accents and bracketed notes removed, punctuation collapsed to spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _NON_WORD.sub(" ", _BRACKETS.sub(" ", text))
+    return " ".join(word for word in text.split() if word not in _FILLER_WORDS)
+
+
+def read_tags(path: str) -> Dict[str, str]:
+    """
+    Reads title/artist/album from the file tags, falling back to the file name
+    ("Artist - Title.mp3" or "title.mp3").
+    """
+    title = artist = album = ""
+    try:
+        audio = mutagen.File(path, easy=True)
+        if audio is not None and audio.tags:
+            title = (audio.tags.get("title") or [""])[0]
+            artist = (audio.tags.get("artist") or [""])[0]
+            album = (audio.tags.get("album") or [""])[0]
+    except Exception as e:
+        logger.warning(f"Could not read tags of {path}: {e}")
+
+    if not title:
+        stem = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+        if " - " in stem and not artist:
+            artist, title = (part.strip() for part in stem.split(" - ", 1))
+        else:
+            title = stem.strip()
+
+    return {"title": title, "artist": artist, "album": album}
+
+
+def _score(query: str, candidate: str) -> float:
+    """Fuzzy score: character similarity or word overlap (F1), whichever is higher."""
+    if not query or not candidate:
+        return 0.0
+    query_words = set(query.split())
+    words = set(candidate.split())
+    overlap = len(query_words & words)
+    word_score = 2 * overlap / (len(query_words) + len(words)) if words else 0.0
+
+    matcher = difflib.SequenceMatcher(None, query, candidate)
+    # Cheap upper bounds first: most of the library is rejected without a full ratio()
+    if max(word_score, matcher.real_quick_ratio()) < MATCH_THRESHOLD:
+        return word_score
+    if max(word_score, matcher.quick_ratio()) < MATCH_THRESHOLD:
+        return word_score
+    return max(word_score, matcher.ratio())
+
+
+def _split_artist(query_words: List[str], artist: str) -> Optional[str]:
+    """
+    Removes the artist name from the start or the end of a query (fuzzy match).
+
+    Returns:
+        str: The rest of the query (the title part), or None if the artist was not said.
+    """
+    n = len(artist.split())
+    if not artist or n >= len(query_words):
+        return None
+
+    best, rest = MATCH_THRESHOLD, None
+    for said, remaining in (
+        (query_words[:n], query_words[n:]),
+        (query_words[-n:], query_words[:-n]),
+    ):
+        score = _score(" ".join(said), artist)
+        if score >= best:
+            best, rest = score, " ".join(remaining)
+    return rest
+
+
+def _match_track(query: str, query_words: List[str], track: Dict[str, Any]) -> Tuple[float, bool]:
+    """
+    Scores a query against one track. Only the title decides whether it matches.
+
+    Returns:
+        tuple: (title score, whether the query named the track's artist)
+    """
+    score = _score(query, track["title_key"])
+    title_part = _split_artist(query_words, track["artist_key"])
+    if title_part is None:
+        return score, False
+    return max(score, _score(title_part, track["title_key"])), True
+
+
+class MusicLibrary:
+    """
+    Persistent fuzzy title/artist index of a local music directory.
+
+    Usage:
+        library = MusicLibrary()
+        library.load()
+        library.scan()
+        library.watch()
+        results = library.search("billie jean")  # [(track, score), ...]
+    """
+
+    def __init__(self, root: str = MUSIC_LIBRARY_DIR, index_path: str = LIBRARY_INDEX_PATH):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path
+        self.tracks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def __len__(self):
+        return len(self.tracks)
+
+    # Index maintenance -------------------------------------------------------
+
+    def _add(self, path: str, stat: os.stat_result):
+        tags = read_tags(path)
+        track = {
+            **tags,
+            "path": path,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "title_key": normalize(tags["title"]),
+            "artist_key": normalize(tags["artist"]),
+        }
+        with self._lock:
+            self._remove_locked(path)
+            self._insert_locked(track)
+
+    def _insert_locked(self, track: Dict[str, Any]):
+        self.tracks[track["path"]] = track
+
+    def _remove_locked(self, path: str) -> bool:
+        return self.tracks.pop(path, None) is not None
+
+    def _is_current(self, path: str, stat: os.stat_result) -> bool:
+        track = self.tracks.get(path)
+        return bool(track) and track["mtime"] == stat.st_mtime and track["size"] == stat.st_size
+
+    def load(self) -> int:
+        """Loads the persisted index (if it was built for the same directory). Returns the track count."""
+        if not os.path.exists(self.index_path):
+            return 0
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable library index {self.index_path}: {e}")
+            return 0
+        if data.get("root") != self.root:
+            return 0
+
+        with self._lock:
+            self.tracks.clear()
+            for track in data.get("tracks", []):
+                # Entries from an older index format are skipped and re-read by scan()
+                if "title_key" in track:
+                    self._insert_locked(track)
+        return len(self.tracks)
+
+    def save(self):
+        """Writes the index to disk (atomic replace)."""
+        with self._lock:
+            data = {"root": self.root, "tracks": list(self.tracks.values())}
+
+        directory = os.path.dirname(self.index_path) or "."
+        fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def scan(self) -> Tuple[int, int]:
+        """
+        Incremental scan of the music directory: only new or changed files have
+        their tags read, and files that disappeared are dropped.
+
+        Returns:
+            tuple: (files added or updated, files removed)
+        """
+        if not os.path.isdir(self.root):
+            logger.warning(f"Music library directory {self.root} not found.")
+            return 0, 0
+
+        start_time = time.perf_counter()
+        seen = set()
+        updated = 0
+
+        for root, dirs, files in os.walk(self.root):
+            for file in files:
+                if not file.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                if not self._is_current(path, stat):
+                    self._add(path, stat)
+                    updated += 1
+
+        with self._lock:
+            removed = [path for path in self.tracks if path not in seen]
+            for path in removed:
+                self._remove_locked(path)
+
+        if updated or removed:
+            self.save()
+        logger.info(
+            f"Library scan: {len(self.tracks)} tracks ({updated} updated, {len(removed)} removed) "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+        return updated, len(removed)
+
+    def apply_changes(self, changes: Iterable[Tuple[watchfiles.Change, str]]) -> int:
+        """Applies a batch of file system events to the index. Returns how many tracks changed."""
+        changed = 0
+        for change, path in changes:
+            if change == watchfiles.Change.deleted:
+                with self._lock:
+                    # A deleted directory takes every track below it
+                    prefix = path.rstrip(os.sep) + os.sep
+                    removed = [p for p in self.tracks if p == path or p.startswith(prefix)]
+                    for p in removed:
+                        self._remove_locked(p)
+                changed += len(removed)
+            elif os.path.isdir(path):
+                # A directory moved into the library: pick up its files
+                changed += sum(self.scan())
+            elif path.lower().endswith(AUDIO_EXTENSIONS):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if not self._is_current(path, stat):
+                    self._add(path, stat)
+                    changed += 1
+
+        if changed:
+            self.save()
+        return changed
+
+    def watch(self):
+        """Starts a background thread that keeps the index in sync with the directory."""
+        if self._watcher or not os.path.isdir(self.root):
+            return
+
+        def run():
+            for changes in watchfiles.watch(self.root, stop_event=self._stop):
+                changed = self.apply_changes(changes)
+                if changed:
+                    logger.info(f"Library updated: {changed} tracks changed ({len(self.tracks)} total)")
+
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """Stops the watcher thread."""
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=2)
+            self._watcher = None
+
+    # Search ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Finds the tracks that best match a spoken query.
+
+        Args:
+            query (str): Free text, e.g. "billie jean by michael jackson".
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: (track, score) pairs with score >= MATCH_THRESHOLD, best first.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        query_words = query.split()
+
+        # Every track is scored: filtering on shared words would let one common word
+        # ("the") hide a misspelled title. _score rejects most tracks with cheap bounds.
+        with self._lock:
+            candidates = list(self.tracks.values())
+
+        results = []
+        for track in candidates:
+            score, artist_said = _match_track(query, query_words, track)
+            if score >= MATCH_THRESHOLD:
+                results.append((track, score, artist_said))
+
+        # Best title first; the artist only breaks ties (e.g. covers of the same song)
+        results.sort(key=lambda result: (result[1], result[2]), reverse=True)
+        return [(track, score) for track, score, _ in results[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or search the local music library index.")
+    parser.add_argument("query", nargs="?", help="Search the index for this query.")
+    parser.add_argument("--music-dir", default=MUSIC_LIBRARY_DIR)
+    parser.add_argument("--index", default=LIBRARY_INDEX_PATH)
+    parser.add_argument("--rescan", action="store_true", help="Rebuild the index from scratch.")
+    args = parser.parse_args()
+
+    library = MusicLibrary(args.music_dir, args.index)
+    if not args.rescan:
+        library.load()
+    library.scan()
+
+    if args.query:
+        start_time = time.perf_counter()
+        results = library.search(args.query, limit=5)
+        elapsed = 1000 * (time.perf_counter() - start_time)
+        for track, score in results:
+            print(f"{score:.2f}  {track['artist'] or '?'} - {track['title']}  ({track['path']})")
+        if not results:
+            print("No local match (would fall back to YouTube).")
+        print(f"Search took {elapsed:.1f} ms over {len(library)} tracks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microphone capture for a single recording (button press or fixed duration).
+
+Kept separate from utils so that light clients (satellite.py) can record without
+importing the STT, RAG, music player and identification dependencies.
+"""
+
+import sounddevice as sd
+
+from audio_buffer import CaptureBuffer, write_temp_wav
+
+
+def capture_audio(button=None, duration=10, sample_rate=44100):
+    """
+    Record audio from the microphone into a preallocated CaptureBuffer.
+    If button is provided, records until button is released.
+    Otherwise, records for fixed duration.
+
+    The stream delivers int16 samples that the callback copies straight into the
+    buffer, so there is no per-block allocation and no float -> int16 conversion.
+
+    Args:
+        button: gpiozero Button object (optional).
+        duration (int): Duration of recording in seconds (used if button is None).
+        sample_rate (int): Sample rate of the recording.
+
+    Returns:
+        CaptureBuffer: The recording (zero-copy access via view()/memoryview()), or None.
+    """
+    if button:
+        print("Recording... Release button to stop.")
+        # Starts with room for 10 s and grows for long presses (bounded at 2 min)
+        buffer = CaptureBuffer(10 * sample_rate, max_samples=120 * sample_rate)
+    else:
+        print(f"Recording for {duration} seconds... Sing now!")
+        n_samples = int(duration * sample_rate)
+        buffer = CaptureBuffer(n_samples, max_samples=n_samples)
+
+    def callback(indata, frames, time, status):
+        if status:
+            print(status)
+        buffer.write(indata[:, 0])
+
+    try:
+        with sd.InputStream(
+            samplerate=sample_rate, channels=1, dtype="int16", callback=callback
+        ):
+            while not buffer.full:
+                if button and not button.is_pressed:
+                    break
+                sd.sleep(50)  # Wait 50ms
+
+        print("Recording finished.")
+
+        if not len(buffer):
+            return None
+        return buffer
+
+    except Exception as e:
+        print(f"Error recording audio: {e}")
+        return None
+
+
+def record_audio(button=None, duration=10, sample_rate=44100):
+    """
+    Record audio from the microphone.
+    If button is provided, records until button is released.
+    Otherwise, records for fixed duration.
+
+    Args:
+        button: gpiozero Button object (optional).
+        duration (int): Duration of recording in seconds (used if button is None).
+        sample_rate (int): Sample rate of the recording.
+
+    Returns:
+        str: Path to the temporary audio file.
+    """
+    buffer = capture_audio(button=button, duration=duration, sample_rate=sample_rate)
+    if buffer is None:
+        return None
+
+    try:
+        # The buffer already holds 16-bit PCM, so the WAV writer uses it without copying
+        return write_temp_wav(buffer.view(), sample_rate)
+    except Exception as e:
+        print(f"Error recording audio: {e}")
+        return None
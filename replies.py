@@ -0,0 +1,36 @@
+"""
+Fixed replies returned by the tools and the inference pipeline.
+
+Defined once here so the TTS stage can pre-render exactly the strings the code returns
+(see tts.PRERENDER_PHRASES). This module has no dependencies, so tts.py can import it
+without initializing the GPIO pins or the sensors.
+"""
+
+# hardware.control_light
+LIGHT_ON_REPLY = "The light has been turned on successfully."
+LIGHT_OFF_REPLY = "The light has been turned off successfully."
+LIGHT_ON_ERROR_REPLY = "Error: Failed to turn on the light."
+LIGHT_OFF_ERROR_REPLY = "Error: Failed to turn off the light."
+
+# hardware.get_environment_metrics
+SENSOR_ERROR_REPLY = "Error: Failed to read from the sensor."
+
+# utils.tocar_musica, utils.pausar_retomar, utils.parar_musica
+MUSIC_PLAYING_REPLY = "Playing your music now."
+MUSIC_PLAY_ERROR_REPLY = "Sorry, I couldn't play that song."
+MUSIC_PAUSED_REPLY = "Music paused."
+MUSIC_RESUMED_REPLY = "Music resumed."
+MUSIC_STOPPED_REPLY = "Music stopped."
+NO_MUSIC_REPLY = "No music is playing."
+
+# utils.detect_music
+RECORDING_ERROR_REPLY = "Failed to record audio."
+
+# satellite.run_room_tool
+ROOM_TOOL_ERROR_REPLY = "Sorry, I can't do that in this room."
+
+# inference.run_inference
+INTERNAL_ERROR_REPLY = "I encountered an internal error while processing your request."
+UNKNOWN_TOOL_REPLY = (
+    "I'm sorry, I tried to access a tool that doesn't exist. Could you try rephrasing? (Internal Error)"
+)
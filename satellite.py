@@ -0,0 +1,149 @@
+import argparse
+import importlib
+import os
+import sys
+
+import requests
+from gpiozero import Button
+
+import recording
+import replies
+
+# Room tools the server hands back to the satellite, mapped to (module, function).
+# The modules are imported on first use, so a satellite without the sensor or the
+# music dependencies still works for conversation.
+SATELLITE_TOOLS = {
+    "control_light": ("hardware", "control_light"),
+    "get_environment_metrics": ("hardware", "get_environment_metrics"),
+    "tocar_musica": ("utils", "tocar_musica"),
+    "pausar_retomar": ("utils", "pausar_retomar"),
+    "parar_musica": ("utils", "parar_musica"),
+    "detect_music": ("utils", "detect_music"),
+}
+
+
+def ask_server(server_url: str, room: str, audio_path: str) -> dict:
+    """
+    Sends a recorded utterance to the Alexa server (server.py).
+
+    Args:
+        server_url (str): Base URL of the server, e.g. http://alexa.local:8000.
+        room (str): Session id for this satellite, usually the room name.
+        audio_path (str): Path to the WAV file to send.
+
+    Returns:
+        dict: {"text": transcription, "response": assistant reply,
+               "action": {"tool", "arguments"} to run in this room, or None}.
+    """
+    with open(audio_path, "rb") as f:
+        reply = requests.post(
+            f"{server_url}/ask",
+            params={"session_id": room},
+            data=f.read(),
+            headers={"Content-Type": "audio/wav"},
+            timeout=120,
+        )
+
+    if reply.status_code == 503:
+        return {
+            "text": None,
+            "response": "I'm busy right now, please try again in a moment.",
+            "action": None,
+        }
+
+    reply.raise_for_status()
+    return reply.json()
+
+
+def run_room_tool(action: dict) -> str:
+    """
+    Runs a room tool selected by the server with this satellite's own hardware.
+
+    Args:
+        action (dict): {"tool": name, "arguments": dict} from the server's reply.
+
+    Returns:
+        str: The tool's reply, or replies.ROOM_TOOL_ERROR_REPLY if it can't run here.
+    """
+    target = SATELLITE_TOOLS.get(action.get("tool"))
+    if target is None:
+        print(f"Unknown room tool from server: {action.get('tool')}")
+        return replies.ROOM_TOOL_ERROR_REPLY
+
+    module_name, function_name = target
+    try:
+        function_to_call = getattr(importlib.import_module(module_name), function_name)
+        return str(function_to_call(**(action.get("arguments") or {})))
+    except Exception as e:
+        print(f"Error running {action['tool']}: {e}")
+        return replies.ROOM_TOOL_ERROR_REPLY
+
+
+def send_tool_result(server_url: str, room: str, result: str):
+    """Reports a room tool's reply so the server's history matches what the user heard."""
+    reply = requests.post(
+        f"{server_url}/tool_result",
+        json={"session_id": room, "result": result},
+        timeout=10,
+    )
+    reply.raise_for_status()
+
+
+def main():
+    """
+    Satellite loop: records on the local button/microphone and lets the server
+    handle STT and inference. Each room keeps its own conversation history.
+    """
+    parser = argparse.ArgumentParser(description="Lightweight Alexa satellite client.")
+    parser.add_argument("--server", default="http://localhost:8000")
+    parser.add_argument("--room", default="living-room", help="Session id for this satellite.")
+    parser.add_argument("--button-pin", type=int, default=20)
+    args = parser.parse_args()
+
+    button = Button(args.button_pin)
+
+    print(f"\n--- Alexa Satellite '{args.room}' Initialized ---")
+    print(f"Server: {args.server}")
+    print(f"Press the BUTTON (GPIO {args.button_pin}) to start recording.")
+    print("Press Ctrl+C to stop.\n")
+
+    while True:
+        try:
+            print("Waiting for button press...")
+            button.wait_for_press()
+
+            audio_path = recording.record_audio(button=button)
+            if not audio_path:
+                continue
+
+            try:
+                result = ask_server(args.server, args.room, audio_path)
+            except requests.RequestException as e:
+                print(f"Error talking to server: {e}")
+                continue
+            finally:
+                try:
+                    os.remove(audio_path)
+                except OSError:
+                    pass
+
+            print(f"Transcribed text: {result.get('text')}")
+
+            response = result.get("response")
+            if result.get("action"):
+                response = run_room_tool(result["action"])
+                try:
+                    send_tool_result(args.server, args.room, response)
+                except requests.RequestException as e:
+                    print(f"Error reporting the tool result to the server: {e}")
+
+            if response:
+                print(f"ALEXA: {response}\n")
+
+        except KeyboardInterrupt:
+            print("\nForced shutdown.")
+            sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import contextlib
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator
+
+# Logger setup
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - [SCHEDULER] - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Priorities (lower value is served first)
+PRIORITY_COMMAND = 0  # Short commands: "turn on the light", "stop the music"
+PRIORITY_CHAT = 1  # Open-ended conversation
+
+PRIORITY_NAMES = {PRIORITY_COMMAND: "command", PRIORITY_CHAT: "chat"}
+
+# Requests with at most this many words are treated as short commands
+COMMAND_MAX_WORDS = 8
+
+
+class SchedulerBusy(Exception):
+    """Raised when a request is rejected by admission control."""
+
+
+def classify_priority(user_input: str) -> int:
+    """
+    Picks a scheduling priority for a user request.
+    Short utterances are almost always device commands, so they go ahead of long chats.
+
+    Args:
+        user_input (str): The text input from the user (or STT system).
+
+    Returns:
+        int: PRIORITY_COMMAND or PRIORITY_CHAT.
+    """
+    if len(user_input.split()) <= COMMAND_MAX_WORDS:
+        return PRIORITY_COMMAND
+    return PRIORITY_CHAT
+
+
+class _Job:
+    def __init__(self, fn, args, kwargs, priority):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class OllamaScheduler:
+    """
+    Serializes calls to Ollama from many sessions.
+
+    Jobs wait in a priority queue and are executed by a fixed pool of worker threads,
+    so at most `max_concurrency` model calls run at the same time.
+
+    Admission control works per request, not per call: `admit()` rejects a new request
+    (SchedulerBusy) once `max_concurrency + max_queue` requests are in flight. An admitted
+    request keeps its slot for all of its calls (router, tool follow-up, ...), so it is
+    never rejected halfway through, after a tool has already run.
+    """
+
+    def __init__(self, max_concurrency: int = 1, max_queue: int = 16):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()  # FIFO order inside the same priority
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._admitted = 0
+        self._local = threading.local()  # Marks threads that hold an admitted request
+        self._stats = {
+            name: {"completed": 0, "rejected": 0, "wait_total": 0.0, "run_total": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+        for i in range(max_concurrency):
+            worker = threading.Thread(
+                target=self._worker, name=f"ollama-worker-{i}", daemon=True
+            )
+            worker.start()
+
+    @contextlib.contextmanager
+    def admit(self, priority: int = PRIORITY_CHAT) -> Iterator[None]:
+        """
+        Admits one request; every submit() from this thread inside the block uses its slot.
+
+        Raises:
+            SchedulerBusy: If too many requests are already in flight.
+        """
+        if getattr(self._local, "admitted", False):
+            yield  # Nested: already holding a slot
+            return
+
+        name = PRIORITY_NAMES.get(priority, "chat")
+        with self._lock:
+            if self._admitted >= self.max_concurrency + self.max_queue:
+                self._stats[name]["rejected"] += 1
+                logger.warning(f"Queue full ({self._admitted} in flight), rejecting {name} request.")
+                raise SchedulerBusy("The assistant is busy, please try again shortly.")
+            self._admitted += 1
+
+        self._local.admitted = True
+        try:
+            yield
+        finally:
+            self._local.admitted = False
+            with self._lock:
+                self._admitted -= 1
+
+    def submit(
+        self, fn: Callable[..., Any], *args, priority: int = PRIORITY_CHAT, **kwargs
+    ) -> Any:
+        """
+        Queues `fn(*args, **kwargs)` and blocks until a worker has executed it.
+        Calls made outside admit() are admitted on their own.
+
+        Raises:
+            SchedulerBusy: If the request cannot be admitted.
+        """
+        with self.admit(priority):
+            return self._run(fn, args, kwargs, priority)
+
+    def _run(self, fn, args, kwargs, priority):
+        with self._lock:
+            self._waiting += 1
+
+        job = _Job(fn, args, kwargs, priority)
+        self._queue.put((priority, next(self._counter), job))
+        job.done.wait()
+
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            started_at = time.monotonic()
+
+            with self._lock:
+                self._waiting -= 1
+                self._running += 1
+
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                job.error = e
+            finally:
+                finished_at = time.monotonic()
+                name = PRIORITY_NAMES.get(job.priority, "chat")
+                with self._lock:
+                    self._running -= 1
+                    stats = self._stats[name]
+                    stats["completed"] += 1
+                    stats["wait_total"] += started_at - job.enqueued_at
+                    stats["run_total"] += finished_at - started_at
+                job.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of queue depth and per-priority wait/run times."""
+        with self._lock:
+            snapshot = {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "waiting": self._waiting,
+                "running": self._running,
+            }
+            for name, stats in self._stats.items():
+                completed = stats["completed"] or 1
+                snapshot[name] = {
+                    "completed": stats["completed"],
+                    "rejected": stats["rejected"],
+                    "avg_wait_s": round(stats["wait_total"] / completed, 3),
+                    "avg_run_s": round(stats["run_total"] / completed, 3),
+                }
+            return snapshot
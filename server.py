@@ -0,0 +1,264 @@
+"""
+Local server mode: one Raspberry Pi runs the model and serves several rooms.
+
+Lightweight satellite clients (see satellite.py) send recorded audio or text over HTTP.
+Each satellite gets its own isolated conversation history, and every Ollama call is
+queued through the OllamaScheduler so the model is never overloaded.
+
+Tools that act on the room (inference.ROOM_TOOLS: light, sensor, music, song
+identification) are not run on the server. The selected call is returned to the satellite
+as "action" ({"tool", "arguments"}); the satellite runs it with its own hardware and posts
+the reply to /tool_result, which replaces the placeholder in the session history.
+
+Endpoints:
+    POST   /sessions                   -> {"session_id": ...}
+    DELETE /sessions/<session_id>
+    POST   /stt                        (body: WAV bytes) -> {"text": ...}
+    POST   /infer                      (json: {"session_id", "text"}) -> {"response", "action"}
+    POST   /ask?session_id=<id>        (body: WAV bytes) -> {"text", "response", "action"}
+    POST   /tool_result                (json: {"session_id", "result"})
+    GET    /stats
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, jsonify, request
+
+import inference
+import scheduler as ollama_scheduler
+import utils
+from main import SYSTEM_PROMPT
+
+# Logger setup
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - [SERVER] - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Sessions idle for longer than this are dropped (seconds)
+SESSION_TTL = 30 * 60
+
+# Kept in the history for a delegated tool until the satellite posts the real reply
+DELEGATED_REPLY = "Sent to the room's device."
+
+
+class SessionStore:
+    """Keeps one conversation history per session, each guarded by its own lock."""
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, session_id: Optional[str] = None) -> str:
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            if session_id not in self._sessions:
+                self._sessions[session_id] = {
+                    "history": [dict(SYSTEM_PROMPT)],
+                    "lock": threading.Lock(),
+                    "last_used": time.monotonic(),
+                    # History index of the tool message awaiting a /tool_result
+                    "pending": None,
+                }
+        return session_id
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """Returns the session, creating it on first use (satellites may use their room name as id)."""
+        self.create(session_id)
+        with self._lock:
+            session = self._sessions[session_id]
+            session["last_used"] = time.monotonic()
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [
+            sid
+            for sid, session in self._sessions.items()
+            if now - session["last_used"] > self.ttl and not session["lock"].locked()
+        ]
+        for sid in expired:
+            logger.info(f"Evicting idle session {sid}")
+            del self._sessions[sid]
+
+
+sessions = SessionStore()
+app = Flask(__name__)
+
+
+def _parse_priority(value):
+    if value is None:
+        return None
+    for priority, name in ollama_scheduler.PRIORITY_NAMES.items():
+        if value == name:
+            return priority
+    return None
+
+
+def _infer(session_id: str, text: str, priority=None) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Runs one turn for a session.
+
+    Returns:
+        tuple: (response, action). `action` is {"tool", "arguments"} when a room tool was
+        selected, for the satellite to run; `response` is then only a placeholder.
+    """
+    session = sessions.get(session_id)
+    actions: List[Dict[str, Any]] = []
+
+    def delegate(tool: str, arguments: Dict[str, Any]) -> str:
+        actions.append({"tool": tool, "arguments": arguments})
+        return DELEGATED_REPLY
+
+    # run_inference mutates the history, so requests of one session run one at a time
+    with session["lock"]:
+        history: List[Dict[str, Any]] = session["history"]
+        response = inference.run_inference(text, history, priority=priority, delegate=delegate)
+        # A delegated turn ends with the tool message and the placeholder reply
+        session["pending"] = len(history) - 2 if actions else None
+    return response, (actions[0] if actions else None)
+
+
+def _transcribe(audio_bytes: bytes):
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio_bytes)
+        return utils.transcribe_audio(path)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _busy_response(error):
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+@app.post("/sessions")
+def create_session():
+    body = request.get_json(silent=True) or {}
+    return jsonify({"session_id": sessions.create(body.get("session_id"))}), 201
+
+
+@app.delete("/sessions/<session_id>")
+def delete_session(session_id):
+    if not sessions.delete(session_id):
+        return jsonify({"error": "Session not found."}), 404
+    return "", 204
+
+
+@app.post("/stt")
+def stt():
+    if not request.data:
+        return jsonify({"error": "Expected WAV audio in the request body."}), 400
+    return jsonify({"text": _transcribe(request.data)})
+
+
+@app.post("/infer")
+def infer():
+    body = request.get_json(silent=True) or {}
+    session_id = body.get("session_id")
+    text = (body.get("text") or "").strip()
+    if not session_id or not text:
+        return jsonify({"error": "Both 'session_id' and 'text' are required."}), 400
+
+    try:
+        response, action = _infer(session_id, text, _parse_priority(body.get("priority")))
+    except ollama_scheduler.SchedulerBusy as e:
+        return _busy_response(e)
+    return jsonify({"response": response, "action": action})
+
+
+@app.post("/ask")
+def ask():
+    session_id = request.args.get("session_id")
+    if not session_id or not request.data:
+        return jsonify({"error": "Expected 'session_id' and WAV audio in the request body."}), 400
+
+    text = _transcribe(request.data)
+    if not text or not text.strip():
+        return jsonify({"text": text, "response": None, "action": None})
+
+    try:
+        response, action = _infer(session_id, text)
+    except ollama_scheduler.SchedulerBusy as e:
+        return _busy_response(e)
+    return jsonify({"text": text, "response": response, "action": action})
+
+
+@app.post("/tool_result")
+def tool_result():
+    body = request.get_json(silent=True) or {}
+    session_id = body.get("session_id")
+    result = body.get("result")
+    if not session_id or not isinstance(result, str):
+        return jsonify({"error": "Both 'session_id' and 'result' are required."}), 400
+
+    session = sessions.get(session_id)
+    with session["lock"]:
+        pending = session["pending"]
+        if pending is None:
+            return jsonify({"error": "No tool call is waiting for a result."}), 409
+        history = session["history"]
+        # Same shape as a direct-response tool run locally: the tool output is the reply
+        history[pending]["content"] = result
+        history[pending + 1]["content"] = result
+        session["pending"] = None
+    return "", 204
+
+
+@app.get("/stats")
+def stats():
+    scheduler_stats = inference.scheduler.stats() if inference.scheduler else None
+    return jsonify(
+        {
+            "sessions": len(sessions),
+            "scheduler": scheduler_stats,
+            "tiers": inference.get_tier_stats(),
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Alexa server for satellite clients.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-concurrency", type=int, default=1, help="Ollama calls allowed to run at once."
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=16, help="Waiting requests before new ones are rejected."
+    )
+    args = parser.parse_args()
+
+    inference.scheduler = ollama_scheduler.OllamaScheduler(
+        max_concurrency=args.max_concurrency, max_queue=args.max_queue
+    )
+
+    print("\n--- Local Alexa Server Initialized ---")
+    print(f"Listening on http://{args.host}:{args.port}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Tests for the local music library index (music_library.py).
+
+Run with: python -m pytest -q test_music_library.py
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("mutagen")
+pytest.importorskip("watchfiles")
+
+import music_library  # noqa: E402
+
+SONGS = [
+    "The Beatles - Let It Be.mp3",
+    "Frank Sinatra - My Way.mp3",
+    "Michael Jackson - Billie Jean.mp3",
+    "Michael Jackson - Smooth Criminal.mp3",
+    "Queen - Bohemian Rhapsody (Remastered 2011).flac",
+    "garota_de_ipanema.ogg",
+]
+
+
+@pytest.fixture
+def library(tmp_path):
+    music_dir = tmp_path / "music"
+    music_dir.mkdir()
+    for name in SONGS:
+        (music_dir / name).write_bytes(b"not really audio")
+
+    library = music_library.MusicLibrary(str(music_dir), str(tmp_path / "index.json"))
+    library.scan()
+    return library
+
+
+def titles(results):
+    return [track["title"] for track, _ in results]
+
+
+@pytest.mark.parametrize(
+    "query, title",
+    [
+        ("billie jean", "Billie Jean"),
+        ("billie jean by michael jackson", "Billie Jean"),
+        ("michael jackson billie jean", "Billie Jean"),
+        ("billy jean by michael jakson", "Billie Jean"),
+        ("queen bohemian rapsody", "Bohemian Rhapsody (Remastered 2011)"),
+        # Misspelled title plus a word another track contains ("the", "my")
+        ("the bohemain rapsody", "Bohemian Rhapsody (Remastered 2011)"),
+        ("my billy jean", "Billie Jean"),
+        ("let it be by the beatles", "Let It Be"),
+        ("garota de ipanema", "garota de ipanema"),
+    ],
+)
+def test_search_finds_owned_songs(library, query, title):
+    assert titles(library.search(query)) == [title]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Songs we don't own by an artist we do own must fall back to YouTube
+        "beat it by michael jackson",
+        "thriller by michael jackson",
+        "michael jackson",
+        "despacito",
+        "jean",
+    ],
+)
+def test_search_misses_songs_not_in_library(library, query):
+    assert library.search(query) == []
+
+
+def test_scan_is_incremental_and_persisted(library, tmp_path):
+    music_dir = tmp_path / "music"
+    (music_dir / "Daft Punk - One More Time.mp3").write_bytes(b"new")
+    os.remove(music_dir / "garota_de_ipanema.ogg")
+
+    assert library.scan() == (1, 1)
+    assert library.scan() == (0, 0)
+
+    reloaded = music_library.MusicLibrary(str(music_dir), str(tmp_path / "index.json"))
+    assert reloaded.load() == len(SONGS)
+    assert titles(reloaded.search("one more time")) == ["One More Time"]
+    assert reloaded.search("garota de ipanema") == []
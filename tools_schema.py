@@ -92,6 +92,16 @@ detect_music_def = {
 }
 
 
+# When to use which tool. Shared by the system prompt (main.SYSTEM_PROMPT) and the
+# fast-tier router prompt (inference.ROUTER_PROMPT) so both tiers follow the same rules.
+tool_usage_rules = (
+    "when the user asks to turn on or off the light, use the 'control_light'.\n"
+    "when the user asks about temperature or humidity, use the 'get_environment_metrics'.\n"
+    "when the user asks to play (NOT IDENTIFY), pause, resume, or stop music, use 'tocar_musica', 'pausar_retomar', or 'parar_musica' respectively.\n"
+    "when the user asks to identify a song, use the 'detect_music' function.\n"
+)
+
+
 # List of all available tools to be imported by the inference engine
 available_tools_definitions = [
     light_tool_def,
@@ -101,3 +111,25 @@ available_tools_definitions = [
     parar_musica_def,
     detect_music_def,
 ]
+
+
+def build_router_schema(tools):
+    """
+    JSON schema for the fast-tier router output (passed to Ollama as `format`).
+    The model must pick one tool name (or "chat" for free-form conversation),
+    give its arguments, and self-report a confidence between 0 and 1.
+    """
+    tool_names = [tool["function"]["name"] for tool in tools]
+    return {
+        "type": "object",
+        "properties": {
+            "tool": {"type": "string", "enum": tool_names + ["chat"]},
+            "arguments": {"type": "object"},
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        },
+        "required": ["tool", "arguments", "confidence"],
+    }
+
+
+# Output schema for the fast-tier router
+router_output_schema = build_router_schema(available_tools_definitions)
@@ -0,0 +1,216 @@
+"""
+Offline text-to-speech output stage.
+
+Replies are split into sentences. Each sentence is synthesized with a local engine
+(Piper if installed with a voice model, otherwise espeak-ng) while the previous one
+is playing, so the first sentence is heard as soon as it is ready.
+
+Synthesized audio is kept in a content-addressed cache on disk, keyed by
+(text, voice, rate). Fixed replies such as "The light has been turned on successfully."
+are pre-rendered at startup and play with no synthesis cost.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Iterable, List, Optional
+
+import sounddevice as sd
+from scipy.io.wavfile import read
+
+import replies
+
+# Logger setup
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - [TTS] - %(message)s")
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TTS_CACHE_DIRECTORY = os.path.join(BASE_DIR, "tts_cache")
+
+# Piper voice model (https://github.com/rhasspy/piper); espeak-ng is the fallback
+PIPER_VOICE = os.environ.get(
+    "PIPER_VOICE", os.path.join(BASE_DIR, "models", "en_US-lessac-medium.onnx")
+)
+ESPEAK_VOICE = os.environ.get("ESPEAK_VOICE", "en-us")
+
+# Fixed replies of the tools and the inference pipeline, rendered at startup
+PRERENDER_PHRASES = [
+    value for name, value in vars(replies).items() if name.endswith("_REPLY")
+]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits a reply into sentences (the unit of synthesis and caching)."""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+@functools.lru_cache(maxsize=64)
+def _load_audio(path: str):
+    """Reads a cached WAV file; frequent phrases stay decoded in memory."""
+    return read(path)
+
+
+class TextToSpeech:
+    """
+    Local TTS engine with a content-addressed on-disk cache.
+
+    Usage:
+        speaker = TextToSpeech()
+        speaker.prerender(PRERENDER_PHRASES)
+        speaker.speak("The light has been turned on successfully.")
+    """
+
+    def __init__(
+        self,
+        voice: Optional[str] = None,
+        rate: float = 1.0,
+        cache_dir: str = TTS_CACHE_DIRECTORY,
+    ):
+        if shutil.which("piper") and os.path.exists(voice or PIPER_VOICE):
+            self.engine = "piper"
+            self.voice = voice or PIPER_VOICE
+        elif shutil.which("espeak-ng"):
+            self.engine = "espeak-ng"
+            self.voice = voice or ESPEAK_VOICE
+        else:
+            raise RuntimeError("No offline TTS engine found (install piper or espeak-ng).")
+
+        self.rate = rate
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        logger.info(f"Using {self.engine} with voice {os.path.basename(self.voice)}")
+
+    def cache_path(self, text: str) -> str:
+        """Content address of a phrase: sha256 of (text, voice, rate)."""
+        key = json.dumps([" ".join(text.split()), f"{self.engine}:{self.voice}", self.rate])
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.wav")
+
+    def synthesize(self, text: str) -> str:
+        """
+        Returns the path to the audio of `text`, synthesizing it on a cache miss.
+
+        Args:
+            text (str): A sentence to speak.
+
+        Returns:
+            str: Path to a WAV file in the cache.
+        """
+        path = self.cache_path(text)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".wav", dir=os.path.dirname(path))
+        os.close(fd)
+
+        try:
+            if self.engine == "piper":
+                subprocess.run(
+                    [
+                        "piper",
+                        "--model", self.voice,
+                        "--output_file", tmp_path,
+                        "--length_scale", f"{1.0 / self.rate:.3f}",
+                    ],
+                    input=text.encode("utf-8"),
+                    check=True,
+                    capture_output=True,
+                )
+            else:
+                subprocess.run(
+                    [
+                        "espeak-ng",
+                        "-v", self.voice,
+                        "-s", str(int(175 * self.rate)),
+                        "-w", tmp_path,
+                        text,
+                    ],
+                    check=True,
+                    capture_output=True,
+                )
+            # Atomic publish: concurrent readers never see a half-written file
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return path
+
+    def prerender(self, phrases: Iterable[str]) -> int:
+        """Synthesizes every sentence of `phrases` that is not cached yet. Returns how many were new."""
+        rendered = 0
+        for phrase in phrases:
+            for sentence in split_sentences(phrase):
+                if not os.path.exists(self.cache_path(sentence)):
+                    try:
+                        self.synthesize(sentence)
+                        rendered += 1
+                    except (OSError, subprocess.CalledProcessError) as e:
+                        logger.error(f"Failed to pre-render '{sentence}': {e}")
+        if rendered:
+            logger.info(f"Pre-rendered {rendered} phrases.")
+        return rendered
+
+    def speak(self, text: str):
+        """
+        Speaks `text` sentence by sentence: the next sentence is synthesized in a
+        background thread while the current one plays.
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+
+        ready = queue.Queue(maxsize=2)
+        cancelled = threading.Event()
+
+        def producer():
+            for sentence in sentences:
+                if cancelled.is_set():
+                    return
+                try:
+                    ready.put(self.synthesize(sentence))
+                except (OSError, subprocess.CalledProcessError) as e:
+                    logger.error(f"Failed to synthesize '{sentence}': {e}")
+            if not cancelled.is_set():
+                ready.put(None)
+
+        threading.Thread(target=producer, daemon=True).start()
+
+        try:
+            while True:
+                path = ready.get()
+                if path is None:
+                    break
+                try:
+                    sample_rate, data = _load_audio(path)
+                except ValueError as e:
+                    # Corrupt cache entry: drop it so the sentence is synthesized again next time
+                    logger.error(f"Removing unreadable cached audio {path}: {e}")
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                sd.play(data, sample_rate)
+                sd.wait()  # Wait until playback is finished
+        finally:
+            # If playback failed, unblock the producer (it may be waiting on a full queue)
+            # and let it exit: after the drain it puts at most one more item, then sees
+            # the cancellation.
+            cancelled.set()
+            while True:
+                try:
+                    ready.get_nowait()
+                except queue.Empty:
+                    break
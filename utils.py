@@ -1,8 +1,5 @@
 import sounddevice as sd
-from scipy.io.wavfile import write
-import numpy as np
 import os
-import tempfile
 from groq import Groq
 from dotenv import load_dotenv
 import yt_dlp
@@ -10,12 +7,17 @@ import subprocess
 import os
 import socket
 import json
+import threading
 import time
 from langchain_ollama import ChatOllama, OllamaEmbeddings
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_chroma import Chroma
-import queue
+from audio_buffer import CaptureBuffer, wav_bytes
+from recording import capture_audio
+import fingerprint
+import music_library
+import replies
 
 load_dotenv()
 
@@ -26,9 +28,32 @@ PERSIST_DIRECTORY = os.path.join(BASE_DIR, "chroma_db")
 # Initialize Local LLM (Ollama)
 llm = ChatOllama(model="llama3.2", temperature=0.1)
 
+# Song identification engine order: "fingerprint-first" or "lyrics-first"
+MUSIC_ID_MODE = os.environ.get("MUSIC_ID_MODE", "fingerprint-first")
 
-def load_retriever():
-    """Load the vector store from disk and create a retriever"""
+# Audio fingerprint index, loaded on first use
+_fingerprint_index = None
+
+# Progressive identification: re-score the candidates while recording continues and
+# answer as soon as the top candidate is far enough ahead of the runner-up
+MUSIC_ID_PROGRESSIVE = os.environ.get("MUSIC_ID_PROGRESSIVE", "false").lower() == "true"
+PROGRESSIVE_MIN_SECONDS = 3.0  # First re-score after this much audio
+PROGRESSIVE_STEP = 1.0  # Re-score every second
+PROGRESSIVE_WINDOW = 6.0  # Sliding window of audio transcribed at each step
+PROGRESSIVE_MARGIN = 0.15  # Relevance margin (top - runner-up) needed to exit early
+PROGRESSIVE_MIN_RELEVANCE = 0.5  # The top candidate must also be a reasonable match
+
+# Local music library, searched before YouTube (loaded and watched on first use)
+_music_library = None
+_music_library_lock = threading.Lock()
+PLAY_START_TIMEOUT = 15.0  # Give up measuring play-start latency after this long
+
+# Time-to-identification and early-exit counters for the progressive mode
+_progressive_stats = {"runs": 0, "early_exits": 0, "time_to_id": []}
+
+
+def load_vectorstore():
+    """Load the vector store from disk"""
     if not os.path.exists(PERSIST_DIRECTORY):
         print(f"Warning: Database directory {PERSIST_DIRECTORY} not found.")
         return None
@@ -41,94 +66,35 @@ def load_retriever():
         embedding_function=embedding_function,
         persist_directory=PERSIST_DIRECTORY,
     )
+    return vectorstore
 
-    retriever = vectorstore.as_retriever(k=3)
-    return retriever
-
-
-def record_audio(button=None, duration=10, sample_rate=44100):
-    """
-    Record audio from the microphone.
-    If button is provided, records until button is released.
-    Otherwise, records for fixed duration.
-
-    Args:
-        button: gpiozero Button object (optional).
-        duration (int): Duration of recording in seconds (used if button is None).
-        sample_rate (int): Sample rate of the recording.
-
-    Returns:
-        str: Path to the temporary audio file.
-    """
-    if button:
-        print("Recording... Release button to stop.")
-        q = queue.Queue()
-
-        def callback(indata, frames, time, status):
-            if status:
-                print(status)
-            q.put(indata.copy())
-
-        try:
-            with sd.InputStream(samplerate=sample_rate, channels=1, callback=callback):
-                while button.is_pressed:
-                    sd.sleep(50)  # Wait 50ms
-
-            print("Recording finished.")
-
-            data_chunks = []
-            while not q.empty():
-                data_chunks.append(q.get())
-
-            if not data_chunks:
-                return None
-
-            recording = np.concatenate(data_chunks, axis=0)
-
-            # Create a temporary file
-            fd, path = tempfile.mkstemp(suffix=".wav")
-
-            # Write the recording to the file
-            # Convert to 16-bit PCM
-            data = (recording * 32767).astype(np.int16)
-            write(path, sample_rate, data)
-
-            # Close the file descriptor
-            os.close(fd)
-
-            return path
 
-        except Exception as e:
-            print(f"Error recording audio: {e}")
-            return None
-
-    else:
-        print(f"Recording for {duration} seconds... Sing now!")
-
-        try:
-            # Record audio
-            recording = sd.rec(
-                int(duration * sample_rate), samplerate=sample_rate, channels=1
-            )
-            sd.wait()  # Wait until recording is finished
-            print("Recording finished.")
-
-            # Create a temporary file
-            fd, path = tempfile.mkstemp(suffix=".wav")
+def load_retriever():
+    """Load the vector store from disk and create a retriever"""
+    vectorstore = load_vectorstore()
+    if not vectorstore:
+        return None
 
-            # Write the recording to the file
-            # Convert to 16-bit PCM
-            data = (recording * 32767).astype(np.int16)
-            write(path, sample_rate, data)
+    retriever = vectorstore.as_retriever(k=3)
+    return retriever
 
-            # Close the file descriptor
-            os.close(fd)
 
-            return path
+def _transcribe(file_name, audio_bytes):
+    """Sends WAV bytes to Groq's Whisper model and returns the text."""
+    client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
 
-        except Exception as e:
-            print(f"Error recording audio: {e}")
-            return None
+    try:
+        transcription = client.audio.transcriptions.create(
+            file=(file_name, audio_bytes),
+            model="whisper-large-v3-turbo",
+            response_format="json",
+            language="en",
+            temperature=0.0,
+        )
+        return transcription.text
+    except Exception as e:
+        print(f"Error during transcription: {e}")
+        return None
 
 
 def transcribe_audio(audio_file_path):
@@ -141,24 +107,25 @@ def transcribe_audio(audio_file_path):
     Returns:
         str: Transcribed text.
     """
-    client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-
     if not os.path.exists(audio_file_path):
         raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
 
-    try:
-        with open(audio_file_path, "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=(os.path.basename(audio_file_path), file.read()),
-                model="whisper-large-v3-turbo",
-                response_format="json",
-                language="en",
-                temperature=0.0,
-            )
-            return transcription.text
-    except Exception as e:
-        print(f"Error during transcription: {e}")
-        return None
+    with open(audio_file_path, "rb") as file:
+        return _transcribe(os.path.basename(audio_file_path), file.read())
+
+
+def transcribe_samples(samples, sample_rate=44100):
+    """
+    Transcribe int16 samples (e.g. CaptureBuffer.view()) without writing a temp file.
+
+    Args:
+        samples (np.ndarray): int16 mono samples.
+        sample_rate (int): Sample rate of the samples.
+
+    Returns:
+        str: Transcribed text.
+    """
+    return _transcribe("audio.wav", wav_bytes(samples, sample_rate))
 
 
 class MusicPlayer:
@@ -171,6 +138,7 @@ class MusicPlayer:
             "quiet": True,
             "default_search": "ytsearch1:",
         }
+        self.play_start_latencies = {"local": [], "remote": []}
 
     def _send_command(self, command_list):
         """Função auxiliar para enviar JSON para o socket do MPV"""
@@ -189,7 +157,82 @@ class MusicPlayer:
         except Exception as e:
             print(f"[Erro] Falha ao comunicar com MPV: {e}")
 
+    def _get_property(self, name):
+        """Reads an MPV property through the socket. Returns None if it is not available yet."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(0.5)
+                client.connect(self.socket_path)
+                payload = json.dumps({"command": ["get_property", name], "request_id": 1}) + "\n"
+                client.send(payload.encode("utf-8"))
+
+                buffer = b""
+                while True:
+                    chunk = client.recv(4096)
+                    if not chunk:
+                        return None
+                    buffer += chunk
+                    # MPV also sends event lines; the reply is the one with our request_id
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        reply = json.loads(line)
+                        if reply.get("request_id") == 1:
+                            return reply.get("data") if reply.get("error") == "success" else None
+        except (OSError, ValueError):
+            return None
+
+    def _measure_play_start(self, process, source, start_time):
+        """Waits until MPV reports a playback position and records the play-start latency."""
+        while time.perf_counter() - start_time < PLAY_START_TIMEOUT:
+            if self.process is not process or process.poll() is not None:
+                return  # Stopped or replaced before it started
+            if self._get_property("playback-time") is not None:
+                latency = time.perf_counter() - start_time
+                self.play_start_latencies[source].append(latency)
+                print(f"[Sistema] Reprodução iniciada ({source}) em {latency:.2f}s")
+                self._report_play_start_stats()
+                return
+            time.sleep(0.05)
+
+    def _report_play_start_stats(self):
+        summary = ", ".join(
+            f"{source}: {stats['plays']} reproduções, média {stats['avg_latency_s']:.2f}s"
+            for source, stats in self.stats().items()
+            if stats["plays"]
+        )
+        print(f"[Sistema] Latência de início: {summary}")
+
+    def stats(self):
+        """Play-start latency (query -> first audio) for local and YouTube hits."""
+        return {
+            source: {
+                "plays": len(latencies),
+                "avg_latency_s": round(sum(latencies) / (len(latencies) or 1), 3),
+                "max_latency_s": round(max(latencies, default=0.0), 3),
+            }
+            for source, latencies in self.play_start_latencies.items()
+        }
+
+    def _resolve(self, query):
+        """Returns (source, mpv target, title): local file if the library has it, else YouTube."""
+        library = load_music_library()
+        if library:
+            results = library.search(query)
+            if results:
+                track, score = results[0]
+                title = f"{track['artist']} - {track['title']}" if track["artist"] else track["title"]
+                print(f"[Sistema] Encontrada na biblioteca local ({score:.2f}): {title}")
+                return "local", track["path"], title
+
+        with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+            info = ydl.extract_info(query, download=False)
+            if "entries" in info:
+                info = info["entries"][0]
+            return "remote", info["url"], info["title"]
+
     def play(self, query):
+        """Plays `query` from the local library or YouTube. Returns True if mpv was started."""
+        start_time = time.perf_counter()
         self.stop()
 
         if os.path.exists(self.socket_path):
@@ -197,37 +240,43 @@ class MusicPlayer:
 
         print(f"\n[Sistema] Buscando: '{query}'...")
 
-        with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-            try:
-                info = ydl.extract_info(query, download=False)
-                if "entries" in info:
-                    info = info["entries"][0]
-
-                url = info["url"]
-                title = info["title"]
-                print(f"[Sistema] Tocando: {title}")
-
-                self.process = subprocess.Popen(
-                    [
-                        "mpv",
-                        "--no-video",
-                        f"--input-ipc-server={self.socket_path}",
-                        "--idle",
-                        url,
-                    ],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-                time.sleep(0.5)
+        try:
+            source, target, title = self._resolve(query)
+            print(f"[Sistema] Tocando: {title}")
+
+            self.process = subprocess.Popen(
+                [
+                    "mpv",
+                    "--no-video",
+                    f"--input-ipc-server={self.socket_path}",
+                    "--idle",
+                    target,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            threading.Thread(
+                target=self._measure_play_start,
+                args=(self.process, source, start_time),
+                daemon=True,
+            ).start()
+            return True
 
-            except Exception as e:
-                print(f"[Erro] Falha ao tocar: {e}")
+        except Exception as e:
+            print(f"[Erro] Falha ao tocar: {e}")
+            return False
 
     def pause_toggle(self):
+        """Toggles pause. Returns True if now paused, False if playing, None if nothing is playing."""
+        if not self.process:
+            print("[Aviso] Nada tocando.")
+            return None
         print("[Sistema] Alternando Pause...")
         self._send_command(["cycle", "pause"])
+        return self._get_property("pause")
 
     def stop(self):
+        """Stops playback. Returns True if something was playing."""
         if self.process:
             self._send_command(["quit"])
             try:
@@ -241,92 +290,354 @@ class MusicPlayer:
                 os.remove(self.socket_path)
 
             print("[Sistema] Parado.")
+            return True
         else:
             print("[Aviso] Já está parado.")
+            return False
+
+
+def load_music_library():
+    """Load the local music library index, scan for changes and start watching (once)"""
+    global _music_library
+
+    with _music_library_lock:
+        if _music_library is None:
+            # Checked again on every call, so a directory created later is picked up
+            if not os.path.isdir(music_library.MUSIC_LIBRARY_DIR):
+                print(f"Warning: Music library {music_library.MUSIC_LIBRARY_DIR} not found.")
+                return None
+
+            print("Loading local music library...")
+            library = music_library.MusicLibrary()
+            library.load()
+            library.scan()
+            library.watch()
+            _music_library = library
+
+    return _music_library
 
 
 player = MusicPlayer()
 
 
 def tocar_musica(query: str):
-    player.play(query)
+    if player.play(query):
+        return replies.MUSIC_PLAYING_REPLY
+    return replies.MUSIC_PLAY_ERROR_REPLY
 
 
 def pausar_retomar():
-    player.pause_toggle()
+    paused = player.pause_toggle()
+    if paused is None:
+        return replies.NO_MUSIC_REPLY
+    return replies.MUSIC_PAUSED_REPLY if paused else replies.MUSIC_RESUMED_REPLY
 
 
 def parar_musica():
-    player.stop()
+    if player.stop():
+        return replies.MUSIC_STOPPED_REPLY
+    return replies.NO_MUSIC_REPLY
+
+
+def load_fingerprint_index():
+    """Load the audio fingerprint index from disk (memory-mapped, loaded once)"""
+    global _fingerprint_index
 
+    if _fingerprint_index is None:
+        if not os.path.exists(fingerprint.FINGERPRINT_DIRECTORY):
+            print(f"Warning: Fingerprint database {fingerprint.FINGERPRINT_DIRECTORY} not found.")
+            return None
+
+        print("Loading fingerprint index...")
+        _fingerprint_index = fingerprint.FingerprintIndex.load()
+
+    return _fingerprint_index
 
-def detect_music():
+
+def identify_by_fingerprint(samples, sample_rate):
     """
-    Tool function to detect music.
-    Handles recording, transcription, and identification internally.
+    Identify a recording by audio fingerprint (works for instrumentals and songs
+    played from a speaker).
+
+    Args:
+        samples (np.ndarray): int16 mono samples.
+        sample_rate (int): Sample rate of the samples.
+
+    Returns:
+        str: The music name, or None if there is no confident match.
     """
-    try:
-        # 1. Prompt and Record
-        print("\n[System] Please sing the song you want to identify (10 seconds)...")
-        audio_path = record_audio(duration=10)
+    index = load_fingerprint_index()
+    if not index:
+        return None
 
-        if not audio_path:
-            return "Failed to record audio."
+    print("[System] Matching audio fingerprint...")
+    result = index.match(fingerprint.to_mono_float(samples, sample_rate))
+    if not result or not result["confident"]:
+        print("[System] No confident fingerprint match.")
+        return None
 
-        # 2. Transcribe
-        print("[System] Transcribing...")
-        sung_lyrics = transcribe_audio(audio_path)
+    print(
+        f"[System] Fingerprint match: {result['music_name']} "
+        f"({result['votes']} votes vs {result['runner_up_votes']})"
+    )
+    return result["music_name"]
 
-        # Cleanup audio file
-        try:
-            os.remove(audio_path)
-        except OSError:
-            pass
 
-        if not sung_lyrics:
-            return "Could not transcribe audio."
+def identify_by_lyrics(samples, sample_rate):
+    """
+    Identify a recording by transcribing the sung lyrics and running RAG over the lyrics database.
 
-        # 3. RAG Identification
-        # Load the retriever
-        retriever = load_retriever()
-        if not retriever:
-            return "Database not found. Cannot identify music."
+    Args:
+        samples (np.ndarray): int16 mono samples.
+        sample_rate (int): Sample rate of the samples.
 
-        start_time = time.time()
+    Returns:
+        str: The music name, or None if the song could not be identified.
+    """
+    # Transcribe
+    print("[System] Transcribing...")
+    sung_lyrics = transcribe_samples(samples, sample_rate)
 
-        print(f"[System] Detecting music from lyrics: '{sung_lyrics}'")
-        print("[System] Retrieving documents...")
-        docs = retriever.invoke(sung_lyrics)
+    if not sung_lyrics:
+        print("[System] Could not transcribe audio.")
+        return None
 
-        # Include metadata in context
-        docs_content = "\n\n".join(
-            f"Music Name: {doc.metadata.get('music_name', 'Unknown')}\nLyrics content: {doc.page_content}"
-            for doc in docs
-        )
+    # RAG Identification
+    # Load the retriever
+    retriever = load_retriever()
+    if not retriever:
+        print("[System] Lyrics database not found. Cannot identify music.")
+        return None
 
-        # Custom prompt for music identification
-        template = """You are a music expert helper. Your task is to identify which song the following lyrics belong to.
-        Use the provided context which contains lyrics and their associated music names.
-        
-        Context:
-        {context}
-        
-        User Input Text: {question}
-        
-        Based on the context, identify the song name. If the input text matches the lyrics in the context, return ONLY the Music Name.
-        If no match is found, return "Music not found".
-        """
-
-        rag_prompt = ChatPromptTemplate.from_template(template)
-        rag_chain = rag_prompt | llm | StrOutputParser()
-        identified_music = rag_chain.invoke(
-            {"context": docs_content, "question": sung_lyrics}
-        )
+    print(f"[System] Detecting music from lyrics: '{sung_lyrics}'")
+    print("[System] Retrieving documents...")
+    docs = retriever.invoke(sung_lyrics)
+
+    # Include metadata in context
+    docs_content = "\n\n".join(
+        f"Music Name: {doc.metadata.get('music_name', 'Unknown')}\nLyrics content: {doc.page_content}"
+        for doc in docs
+    )
+
+    # Custom prompt for music identification
+    template = """You are a music expert helper. Your task is to identify which song the following lyrics belong to.
+    Use the provided context which contains lyrics and their associated music names.
+    
+    Context:
+    {context}
+    
+    User Input Text: {question}
+    
+    Based on the context, identify the song name. If the input text matches the lyrics in the context, return ONLY the Music Name.
+    If no match is found, return "Music not found".
+    """
+
+    rag_prompt = ChatPromptTemplate.from_template(template)
+    rag_chain = rag_prompt | llm | StrOutputParser()
+    identified_music = rag_chain.invoke(
+        {"context": docs_content, "question": sung_lyrics}
+    ).strip()
+
+    if not identified_music or "music not found" in identified_music.lower():
+        return None
+    return identified_music
+
+
+class ProgressiveLyricsScorer:
+    """
+    Accumulates lyrics-retrieval evidence over successive partial transcripts.
+
+    Every step retrieves the closest lyric chunks with relevance scores (0..1). The
+    evidence of each song is a moving average of its best chunk score per step
+    (0 when it was not retrieved), so a song has to stay on top to win.
+    """
+
+    def __init__(self, vectorstore, k=4, alpha=0.6):
+        self.vectorstore = vectorstore
+        self.k = k
+        self.alpha = alpha
+        self.evidence = {}
+        self.steps = 0
+
+    def update(self, transcript):
+        results = self.vectorstore.similarity_search_with_relevance_scores(transcript, k=self.k)
+
+        best = {}
+        for doc, score in results:
+            name = doc.metadata.get("music_name", "Unknown")
+            best[name] = max(best.get(name, 0.0), score)
+
+        if self.steps == 0:
+            self.evidence = best
+        else:
+            for name in set(self.evidence) | set(best):
+                previous = self.evidence.get(name, 0.0)
+                self.evidence[name] = previous + self.alpha * (best.get(name, 0.0) - previous)
+        self.steps += 1
+
+    def leader(self):
+        """Returns (music name, evidence, margin over the runner-up)."""
+        ranked = sorted(self.evidence.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None, 0.0, 0.0
+
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0], ranked[0][1], ranked[0][1] - runner_up
+
+    def confident(self):
+        """Returns the leading music name once it passes the confidence threshold, else None."""
+        name, evidence, margin = self.leader()
+        if margin >= PROGRESSIVE_MARGIN and evidence >= PROGRESSIVE_MIN_RELEVANCE:
+            return name
+        return None
+
+
+def identify_progressive(mode=None, duration=10, sample_rate=44100):
+    """
+    Record and identify at the same time.
+    Every PROGRESSIVE_STEP seconds the last PROGRESSIVE_WINDOW seconds are transcribed
+    and the lyrics candidates re-scored (plus a fingerprint check, which is cheap, unless
+    mode is "lyrics-first"). Recording stops as soon as a candidate is confident.
+
+    Args:
+        mode (str): "fingerprint-first" or "lyrics-first" (default MUSIC_ID_MODE).
+        duration (int): Maximum recording length in seconds.
+        sample_rate (int): Sample rate of the recording.
+
+    Returns:
+        tuple: (music name or None, CaptureBuffer with the recording, early exit flag,
+        number of samples the last fingerprint check covered)
+    """
+    mode = mode or MUSIC_ID_MODE
+    n_samples = int(duration * sample_rate)
+    buffer = CaptureBuffer(n_samples, max_samples=n_samples)
+
+    vectorstore = load_vectorstore()
+    scorer = ProgressiveLyricsScorer(vectorstore) if vectorstore else None
+    use_fingerprint = mode != "lyrics-first" and load_fingerprint_index() is not None
+
+    def callback(indata, frames, time, status):
+        if status:
+            print(status)
+        buffer.write(indata[:, 0])
+
+    identified_music = None
+    fingerprinted = 0
+    next_step = PROGRESSIVE_MIN_SECONDS
+
+    with sd.InputStream(samplerate=sample_rate, channels=1, dtype="int16", callback=callback):
+        while not buffer.full:
+            sd.sleep(50)
+            recorded = len(buffer) / sample_rate
+            if recorded < next_step:
+                continue
+            next_step = recorded + PROGRESSIVE_STEP
+
+            samples = buffer.view()
+            if use_fingerprint:
+                identified_music = identify_by_fingerprint(samples, sample_rate)
+                fingerprinted = len(samples)
+                if identified_music:
+                    break
+
+            if scorer:
+                window = samples[-int(PROGRESSIVE_WINDOW * sample_rate) :]
+                transcript = transcribe_samples(window, sample_rate)
+                if not transcript:
+                    continue
+
+                scorer.update(transcript)
+                name, evidence, margin = scorer.leader()
+                print(
+                    f"[System] {recorded:.1f}s: '{transcript}' -> {name} "
+                    f"(score {evidence:.2f}, margin {margin:.2f})"
+                )
+                identified_music = scorer.confident()
+                if identified_music:
+                    break
+
+    early_exit = identified_music is not None and not buffer.full
+    print("Recording finished.")
+    return identified_music, buffer, early_exit, fingerprinted
+
+
+def _report_progressive_stats(time_to_id, early_exit):
+    """Records one progressive run and prints the running early-exit rate and time-to-identification."""
+    stats = _progressive_stats
+    stats["runs"] += 1
+    stats["early_exits"] += int(early_exit)
+    if time_to_id is not None:
+        stats["time_to_id"].append(time_to_id)
+
+    times = stats["time_to_id"]
+    mean_time = sum(times) / len(times) if times else 0.0
+    print(
+        f"[System] Progressive ID: early exit in {stats['early_exits']}/{stats['runs']} runs "
+        f"({100 * stats['early_exits'] / stats['runs']:.0f}%), "
+        f"mean time-to-identification {mean_time:.2f}s"
+    )
+
+
+def detect_music(mode=None):
+    """
+    Tool function to detect music.
+    Handles recording and identification internally. The engines are tried in the
+    order given by `mode` (default MUSIC_ID_MODE), on the same recording:
+        "fingerprint-first": audio fingerprint, then lyrics (STT + RAG)
+        "lyrics-first": lyrics (STT + RAG), then audio fingerprint
+    With MUSIC_ID_PROGRESSIVE enabled, identification runs while recording and
+    stops early once confident; the engines above are the fallback after 10 seconds.
+    """
+    mode = mode or MUSIC_ID_MODE
+    engines = [identify_by_fingerprint, identify_by_lyrics]
+    if mode == "lyrics-first":
+        engines.reverse()
+
+    try:
+        # 1. Prompt and Record
+        print("\n[System] Please sing or play the song you want to identify (10 seconds)...")
+        sample_rate = 44100
+        identified_music = None
+        early_exit = False
+        fingerprinted = 0
+
+        if MUSIC_ID_PROGRESSIVE:
+            recording_start = time.time()
+            identified_music, recording, early_exit, fingerprinted = identify_progressive(
+                mode=mode, duration=10, sample_rate=sample_rate
+            )
+        else:
+            recording = capture_audio(duration=10, sample_rate=sample_rate)
+
+        # "Time" is the identification latency after recording stops, in both modes
+        start_time = time.time()
+
+        if recording is None or not len(recording):
+            return replies.RECORDING_ERROR_REPLY
+
+        # 2. Identify (on the full recording)
+        if not identified_music:
+            for engine in engines:
+                # The last progressive step may already have fingerprinted the whole recording
+                if engine is identify_by_fingerprint and fingerprinted >= len(recording):
+                    continue
+                identified_music = engine(recording.view(), sample_rate)
+                if identified_music:
+                    break
 
         end_time = time.time()
         latency = end_time - start_time
 
-        result_msg = f"I identified the song as: {identified_music.strip()} (Time: {latency:.2f}s)"
+        if MUSIC_ID_PROGRESSIVE:
+            # Time-to-identification counts from the start of the recording
+            time_to_id = end_time - recording_start
+            print(f"[System] Time-to-identification: {time_to_id:.2f}s")
+            _report_progressive_stats(time_to_id if identified_music else None, early_exit)
+
+        if identified_music:
+            result_msg = f"I identified the song as: {identified_music} (Time: {latency:.2f}s)"
+        else:
+            result_msg = f"Music not found (Time: {latency:.2f}s)"
         print(f"[System] {result_msg}")
 
         return result_msg
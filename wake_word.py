@@ -0,0 +1,353 @@
+"""
+Hands-free wake word mode.
+
+Audio is captured continuously into a fixed-size ring buffer. A cheap energy gate
+runs on every 80 ms hop and the keyword-spotting model (ONNX) only runs while the
+gate is open, so idle CPU use stays low and the cores are left for Ollama.
+When the wake word fires, the utterance is recorded until silence and saved to a
+WAV file that starts `pre_roll` seconds before the detection, so the beginning of
+the command is never clipped.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+import sounddevice as sd
+
+from audio_buffer import RingBuffer, write_temp_wav
+
+# Logger setup
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - [WAKE WORD] - %(message)s")
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuration
+SAMPLE_RATE = 16000  # KWS models and Whisper both work at 16 kHz
+HOP_SIZE = 1280  # 80 ms per gate decision
+WINDOW_SECONDS = 1.0  # Audio seen by the keyword-spotting model
+MODEL_PATH = os.environ.get(
+    "WAKE_WORD_MODEL", os.path.join(BASE_DIR, "models", "wake_word.onnx")
+)
+
+# Log-mel front end
+N_FFT = 512
+MEL_HOP = 160  # 10 ms
+N_MELS = 40
+
+
+@functools.lru_cache(maxsize=4)
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular mel filterbank of shape (n_mels, n_fft // 2 + 1)."""
+
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+def log_mel_spectrogram(
+    samples: np.ndarray, sample_rate: int = SAMPLE_RATE, n_mels: int = N_MELS
+) -> np.ndarray:
+    """
+    Computes log-mel features for a block of audio.
+
+    Args:
+        samples (np.ndarray): float32 mono samples.
+        sample_rate (int): Sample rate of the samples.
+        n_mels (int): Number of mel bands.
+
+    Returns:
+        np.ndarray: float32 array of shape (frames, n_mels).
+    """
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::MEL_HOP]
+    spectrum = np.fft.rfft(frames * np.hanning(N_FFT).astype(np.float32), axis=1)
+    power = (spectrum.real**2 + spectrum.imag**2).astype(np.float32)
+    mel = power @ _mel_filterbank(sample_rate, N_FFT, n_mels).T
+    return np.log(mel + 1e-6)
+
+
+class EnergyGate:
+    """
+    Adaptive RMS gate in front of the keyword spotter.
+
+    The noise floor follows the room level while the gate is closed. The gate opens
+    when a hop is `ratio` times louder than the floor and stays open for `hangover`
+    hops after the last loud one, so the model sees the whole wake word.
+    """
+
+    def __init__(
+        self, ratio: float = 3.0, min_rms: float = 0.005, hangover: int = 6, alpha: float = 0.05
+    ):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.hangover = hangover
+        self.alpha = alpha
+        self.noise_floor = min_rms
+        self._hold = 0
+
+    def threshold(self) -> float:
+        return max(self.min_rms, self.noise_floor * self.ratio)
+
+    def update(self, block: np.ndarray) -> bool:
+        """Returns True if the gate is open after this hop."""
+        rms = float(np.sqrt(np.mean(np.square(block, dtype=np.float32))))
+
+        if rms > self.threshold():
+            self._hold = self.hangover
+            return True
+
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+
+        self.noise_floor += self.alpha * (rms - self.noise_floor)
+        return False
+
+
+class KeywordSpotter:
+    """
+    Small ONNX keyword-spotting model.
+
+    The model takes log-mel features shaped (1, frames, n_mels) and outputs the
+    wake word probability. Inference is pinned to a single thread.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH, sample_rate: int = SAMPLE_RATE):
+        import onnxruntime as ort
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Wake word model not found: {model_path}")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.n_mels = model_input.shape[-1] if isinstance(model_input.shape[-1], int) else N_MELS
+        self.n_frames = model_input.shape[1] if isinstance(model_input.shape[1], int) else None
+        self.sample_rate = sample_rate
+
+    def score(self, window: np.ndarray) -> float:
+        features = log_mel_spectrogram(window, self.sample_rate, self.n_mels)
+
+        if self.n_frames is not None:
+            if len(features) < self.n_frames:
+                pad = np.full(
+                    (self.n_frames - len(features), self.n_mels), features.min(), dtype=np.float32
+                )
+                features = np.concatenate((pad, features))
+            features = features[-self.n_frames :]
+
+        outputs = self.session.run(None, {self.input_name: features[np.newaxis].astype(np.float32)})
+        return float(np.asarray(outputs[0]).ravel()[-1])
+
+
+class WakeWordDetector:
+    """
+    Energy gate + keyword spotter over a RingBuffer.
+
+    Call `process(ring, position)` once per new hop. It returns True when the wake word fires.
+    Counters are kept for the benchmark (how often the model actually ran).
+    """
+
+    def __init__(
+        self,
+        spotter: KeywordSpotter,
+        gate: Optional[EnergyGate] = None,
+        threshold: float = 0.5,
+        refractory: float = 1.0,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.spotter = spotter
+        self.gate = gate or EnergyGate()
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.window_size = int(WINDOW_SECONDS * sample_rate)
+        self.refractory = int(refractory * sample_rate)
+
+        self.hops = 0
+        self.model_runs = 0
+        self.onset = None  # Position where the gate last opened
+        self._last_detection = -self.refractory
+        self._gate_open = False
+
+    def process(self, ring: RingBuffer, position: Optional[int] = None) -> bool:
+        if position is None:
+            position = ring.total_written
+        self.hops += 1
+
+        is_open = self.gate.update(ring.read(position - HOP_SIZE, position))
+        if is_open and not self._gate_open:
+            self.onset = position - HOP_SIZE
+        self._gate_open = is_open
+
+        if not is_open or position - self._last_detection < self.refractory:
+            return False
+
+        self.model_runs += 1
+        window = ring.read(max(0, position - self.window_size), position)
+        if self.spotter.score(window) >= self.threshold:
+            self._last_detection = position
+            return True
+        return False
+
+
+class WakeWordListener:
+    """
+    Continuously listens on the microphone and returns recorded commands.
+
+    Usage:
+        with WakeWordListener() as listener:
+            audio_path = listener.listen()
+    """
+
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        threshold: float = 0.5,
+        pre_roll: float = 1.5,
+        silence: float = 0.8,
+        max_duration: float = 8.0,
+    ):
+        self.pre_roll = int(pre_roll * SAMPLE_RATE)
+        self.silence = int(silence * SAMPLE_RATE)
+        self.max_duration = int(max_duration * SAMPLE_RATE)
+        # Room for the pre-roll, the longest command and some slack
+        self.ring = RingBuffer(self.pre_roll + self.max_duration + 2 * SAMPLE_RATE)
+        self.detector = WakeWordDetector(KeywordSpotter(model_path), threshold=threshold)
+        self._new_data = threading.Event()
+        self._stream = None
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            logger.warning(status)
+        self.ring.write(indata[:, 0])
+        self._new_data.set()
+
+    def start(self):
+        stream = sd.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=1,
+            dtype="float32",
+            blocksize=HOP_SIZE,
+            callback=self._callback,
+        )
+        try:
+            stream.start()
+        except Exception:
+            stream.close()
+            raise
+        self._stream = stream
+
+    def stop(self):
+        if self._stream:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        Closes the microphone stream for the duration of the block, so tools can open
+        their own capture stream on the same device (detect_music) and the assistant's
+        own speech is not heard.
+        """
+        self.stop()
+        try:
+            yield
+        finally:
+            try:
+                self.start()
+            except Exception as e:
+                # e.g. the device is still busy after playback: listen() retries
+                logger.warning(f"Could not reopen the microphone: {e}")
+
+    def _ensure_started(self, retry_delay: float = 1.0):
+        """Opens the stream if it is closed, retrying until the device is available."""
+        warned = False
+        while self._stream is None:
+            try:
+                self.start()
+            except Exception as e:
+                if not warned:
+                    logger.warning(f"Could not open the microphone ({e}), retrying...")
+                    warned = True
+                time.sleep(retry_delay)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _hops(self):
+        """Yields the ring position every time a new hop of audio is available."""
+        next_position = self.ring.total_written + HOP_SIZE
+        while True:
+            self._new_data.wait(timeout=1.0)
+            self._new_data.clear()
+            while self.ring.total_written >= next_position:
+                yield next_position
+                next_position += HOP_SIZE
+
+    def wait_for_wake_word(self) -> int:
+        """Blocks until the wake word is heard. Returns the ring position of the detection."""
+        for position in self._hops():
+            if self.detector.process(self.ring, position):
+                logger.info("Wake word detected.")
+                return position
+
+    def record_utterance(self, detected_at: int) -> Optional[str]:
+        """
+        Keeps recording after the wake word until `silence` seconds of quiet.
+
+        Returns:
+            str: Path to a WAV file that includes the pre-roll audio.
+        """
+        start = max(0, detected_at - self.pre_roll, self.ring.total_written - self.ring.capacity)
+        quiet = 0
+
+        for position in self._hops():
+            hop = self.ring.read(position - HOP_SIZE, position)
+            rms = float(np.sqrt(np.mean(np.square(hop))))
+            quiet = quiet + HOP_SIZE if rms < self.detector.gate.threshold() else 0
+
+            if quiet >= self.silence or position - detected_at >= self.max_duration:
+                break
+
+        print("Recording finished.")
+        return write_temp_wav(self.ring.read(start, position), SAMPLE_RATE)
+
+    def listen(self) -> Optional[str]:
+        """Waits for the wake word, then records the command. Returns the WAV path."""
+        self._ensure_started()
+        detected_at = self.wait_for_wake_word()
+        print("Wake word detected! Listening...")
+        return self.record_utterance(detected_at)